@@ -1,305 +1,142 @@
 import pygame
-import random
-import math
+import argparse
+import sys
 import time
 
-# --- 1. 初始化与参数配置 ---
-pygame.init()
+from asset_cache import ASSET_CACHE
+from bloom import GLOW_MODES
+from drone import FADE_ALPHA, PARTICLE_COUNT, FrameRenderer
+from pointcloud import DEPTH_ORDERS
+from profiler import NULL_PROFILER, FrameProfiler, ProfilerOverlay
+from projectors import ProjectorLayout, TiledOutput, parse_grid
+from quality import QUALITY_NAMES, QualityGovernor
+from recorder import RECORD_FORMATS, FrameRecorder
+from render_target import Display, ScaledRenderTarget, parse_size
 
-# 屏幕与性能设置
+# --- 1. 初始化与参数配置 ---
+# 默认窗口尺寸；窗口在 main() 中才打开（见 render_target.Display），导入本模块不会初始化显示
 WIDTH, HEIGHT = 1280, 720
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("3D无人机灯光秀 - 飞机粒子效果")
-CLOCK = pygame.time.Clock()
-
-# --- 2. 颜色配置 (发光效果配色) ---
-COLOR_WHITE = (255, 255, 255)  # 白色光点
-COLOR_BLUE = (150, 200, 255)  # 蓝色光点
-COLOR_PINK = (255, 200, 255)  # 粉红色光点
-COLOR_CYAN = (150, 255, 255)  # 青色光点
-COLOR_BG = (5, 10, 40)  # 深蓝背景
-
-PARTICLE_COUNT = 800  # 3D点云需要更多粒子
-FADE_ALPHA = 15  # 拖尾效果
-
-# 创建背景遮罩实现长曝光拖尾
-FADE_SURFACE = pygame.Surface((WIDTH, HEIGHT))
-FADE_SURFACE.fill(COLOR_BG)
-FADE_SURFACE.set_alpha(FADE_ALPHA)
-
-# --- 3. 3D数学函数 ---
-def rotate_x(point, angle):
-    """绕X轴旋转"""
-    x, y, z = point
-    cos_a, sin_a = math.cos(angle), math.sin(angle)
-    new_y = y * cos_a - z * sin_a
-    new_z = y * sin_a + z * cos_a
-    return (x, new_y, new_z)
-
-def rotate_y(point, angle):
-    """绕Y轴旋转"""
-    x, y, z = point
-    cos_a, sin_a = math.cos(angle), math.sin(angle)
-    new_x = x * cos_a + z * sin_a
-    new_z = -x * sin_a + z * cos_a
-    return (new_x, y, new_z)
-
-def rotate_z(point, angle):
-    """绕Z轴旋转"""
-    x, y, z = point
-    cos_a, sin_a = math.cos(angle), math.sin(angle)
-    new_x = x * cos_a - y * sin_a
-    new_y = x * sin_a + y * cos_a
-    return (new_x, new_y, z)
-
-def perspective_project(point, camera_distance=5.0):
-    """透视投影：将3D点投影到2D屏幕"""
-    x, y, z = point
-    
-    # 透视投影公式
-    # 添加相机距离，使得z=0时投影正常
-    z = z + camera_distance
-    
-    if z <= 0:
-        return None  # 点在相机后面
-    
-    # 透视投影
-    fov = 500  # 视野参数
-    screen_x = x * fov / z + WIDTH / 2
-    screen_y = y * fov / z + HEIGHT / 2
-    
-    # 返回2D坐标和深度值（用于排序和大小调整）
-    return (screen_x, screen_y, z)
-
-# --- 4. 飞机3D点云定义 ---
-def get_airplane_3d_points():
-    """定义飞机的3D点云（点云技术，类似无人机灯光秀）"""
-    points = []
-    
-    # 从2D轮廓扩展为3D点云
-    # 机头部分（圆形，增加Z轴厚度）
-    for i in range(20):
-        angle = math.pi * (i / 20)
-        for z in [-0.03, 0, 0.03]:  # 3层深度
-            x = 0.4 + math.cos(angle) * 0.08
-            y = math.sin(angle) * 0.06
-            points.append((x, y, z))
-    
-    # 机身上边缘（增加Z轴变化）
-    for i in range(30):
-        for z_offset in [-0.02, 0, 0.02]:
-            x = 0.32 - (i / 30) * 0.92
-            y = 0.06 - (i / 30) * 0.02
-            z = z_offset
-            points.append((x, y, z))
-    
-    # 垂直尾翼
-    for i in range(15):
-        x = -0.62 - (i / 15) * 0.05
-        y = 0.06 + (i / 15) * 0.22
-        for z in [-0.02, 0, 0.02]:
-            points.append((x, y, z))
-    
-    # 垂直尾翼顶部
-    points.append((-0.67, 0.28, 0))
-    points.append((-0.65, 0.3, 0))
-    
-    # 机身下边缘
-    for i in range(30):
-        for z_offset in [-0.02, 0, 0.02]:
-            x = -0.6 + (i / 30) * 0.92
-            y = 0.04 - (i / 30) * 0.10
-            z = z_offset
-            points.append((x, y, z))
-    
-    # 机翼（3D厚度）
-    # 右翼
-    for i in range(25):
-        x = 0.0 + (i / 25) * 0.35
-        y = 0.02 - (i / 25) * 0.25
-        for z in [-0.15, -0.1, -0.05, 0, 0.05, 0.1, 0.15]:  # 机翼有厚度
-            points.append((x, y, z))
-    
-    # 左翼
-    for i in range(25):
-        x = -0.3 - (i / 25) * 0.3
-        y = 0.01 - (i / 25) * 0.22
-        for z in [-0.15, -0.1, -0.05, 0, 0.05, 0.1, 0.15]:
-            points.append((x, y, z))
-    
-    # 引擎（3D圆形）
-    engine_points = [
-        (0.15, -0.18, 0),
-        (-0.15, -0.17, 0),
-    ]
-    for ep in engine_points:
-        for i in range(12):
-            angle = 2 * math.pi * (i / 12)
-            for z_offset in [-0.04, 0, 0.04]:
-                x = ep[0] + math.cos(angle) * 0.04
-                y = ep[1] + math.sin(angle) * 0.04
-                z = ep[2] + z_offset
-                points.append((x, y, z))
-    
-    return points
-
-
-class Particle3D:
-    """3D粒子对象（类似无人机灯光秀中的每个无人机）"""
-    
-    def __init__(self, x3d, y3d, z3d, color_variant):
-        self.x3d = x3d  # 3D坐标
-        self.y3d = y3d
-        self.z3d = z3d
-        self.base_x3d = x3d  # 原始3D坐标（用于旋转）
-        self.base_y3d = y3d
-        self.base_z3d = z3d
-        
-        self.color_variant = color_variant
-        self.phase = random.uniform(0, 2 * math.pi)
-        
-        # 2D投影坐标
-        self.x2d = 0
-        self.y2d = 0
-        self.depth = 0  # 深度值（用于排序）
-        self.size = 2
-        
-        colors = [COLOR_WHITE, COLOR_BLUE, COLOR_CYAN, COLOR_PINK]
-        self.color = colors[color_variant % len(colors)]
-    
-    def rotate(self, angle_x, angle_y, angle_z):
-        """应用3D旋转"""
-        point = (self.base_x3d, self.base_y3d, self.base_z3d)
-        point = rotate_x(point, angle_x)
-        point = rotate_y(point, angle_y)
-        point = rotate_z(point, angle_z)
-        self.x3d, self.y3d, self.z3d = point
-    
-    def project(self, camera_distance=5.0):
-        """投影到2D屏幕"""
-        result = perspective_project((self.x3d, self.y3d, self.z3d), camera_distance)
-        if result:
-            self.x2d, self.y2d, self.depth = result
-            # 根据深度调整粒子大小（近大远小）
-            self.size = max(1, 4 - self.depth * 0.3)
-            return True
-        return False
-    
-    def update_color(self, current_time):
-        """更新颜色（动态闪烁）"""
-        colors = [COLOR_WHITE, COLOR_BLUE, COLOR_CYAN, COLOR_PINK]
-        base_color = colors[self.color_variant % len(colors)]
-        brightness = 0.6 + 0.4 * math.sin(current_time * 2 + self.phase)
-        self.color = tuple(int(min(255, c * brightness)) for c in base_color)
-    
-    def draw(self, surface):
-        """绘制粒子"""
-        if self.depth <= 0:
-            return
-        
-        # 绘制主光点
-        pygame.draw.circle(surface, self.color, (int(self.x2d), int(self.y2d)), int(self.size))
-        
-        # 外发光效果（根据深度调整透明度）
-        glow_alpha = int(80 * (1 - self.depth / 10))
-        if glow_alpha > 0:
-            glow_surface = pygame.Surface((int(self.size * 4), int(self.size * 4)), pygame.SRCALPHA)
-            glow_color = (*self.color, glow_alpha)
-            pygame.draw.circle(glow_surface, glow_color,
-                              (int(self.size * 2), int(self.size * 2)),
-                              int(self.size * 2))
-            surface.blit(glow_surface,
-                        (int(self.x2d - self.size * 2), int(self.y2d - self.size * 2)),
-                        special_flags=pygame.BLEND_ADD)
-
-
-def generate_3d_particles(points_3d, scale=300):
-    """从3D点云生成粒子"""
-    particles = []
-    
-    # 均匀采样点云
-    step = max(1, len(points_3d) // PARTICLE_COUNT)
-    
-    for i in range(0, len(points_3d), step):
-        if len(particles) >= PARTICLE_COUNT:
-            break
-        
-        x, y, z = points_3d[i]
-        # 缩放3D坐标
-        x3d = x * scale
-        y3d = y * scale
-        z3d = z * scale
-        
-        color_variant = i % 4
-        particles.append(Particle3D(x3d, y3d, z3d, color_variant))
-    
-    # 补充粒子
-    while len(particles) < PARTICLE_COUNT:
-        point = random.choice(points_3d)
-        x, y, z = point
-        x3d = x * scale
-        y3d = y * scale
-        z3d = z * scale
-        color_variant = random.randint(0, 3)
-        particles.append(Particle3D(x3d, y3d, z3d, color_variant))
-    
-    return particles[:PARTICLE_COUNT]
-
-
-def main():
-    # 获取3D点云
-    points_3d = get_airplane_3d_points()
-    
-    # 生成3D粒子
-    particles = generate_3d_particles(points_3d, scale=200)
-    
+CAPTION = "3D无人机灯光秀 - 飞机粒子效果"
+
+# 点云、场景与帧渲染在 drone.py 中（可被其他脚本导入，不打开窗口）；
+# FADE_ALPHA 与 FrameRenderer 供离线渲染按脚本名加载使用
+
+
+# --- 2. 主循环 ---
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="3D无人机灯光秀 - 飞机粒子效果")
+    parser.add_argument("--profile", action="store_true", help="显示分阶段性能叠加层（F3 切换）")
+    parser.add_argument("--trace", metavar="PATH", help="退出时导出逐帧性能追踪（.json 或 .csv）")
+    parser.add_argument("--depth-order", choices=DEPTH_ORDERS, default="bucket",
+                        help="additive：光点全部加法混合、不排序；bucket：深度分桶；sort：精确排序")
+    parser.add_argument("--formation", metavar="PATH", action="append",
+                        help="编队文件（.lgf）、OBJ 网格（.obj）或内置编队 airplane / sphere；重复给出时按顺序循环变换（默认内置飞机）")
+    parser.add_argument("--hold", type=float, default=6.0, help="多个编队时每个编队停留的秒数")
+    parser.add_argument("--morph", type=float, default=3.0, help="多个编队时相邻编队之间变换的秒数")
+    parser.add_argument("--glow", choices=GLOW_MODES, default="sprites",
+                        help="外发光：sprites 逐光点贴图；bloom 整帧降分辨率模糊（光点很多时更快）")
+    parser.add_argument("--particles", type=int, default=PARTICLE_COUNT, help="无人机（粒子）数量")
+    parser.add_argument("--quality", choices=["auto", *QUALITY_NAMES], default="auto",
+                        help="画质等级：auto 为按帧耗时自动调节，其余为固定等级（录制时使用）")
+    parser.add_argument("--size", type=parse_size, help=f"输出分辨率，如 3840x2160（默认 {WIDTH}x{HEIGHT}）")
+    parser.add_argument("--fullscreen", action="store_true", help="全屏输出（未指定 --size 时使用桌面分辨率）")
+    parser.add_argument("--render-scale", type=float, default=1.0,
+                        help="内部渲染分辨率占输出分辨率的比例，如 0.5（4K 投影时减轻填充开销）")
+    parser.add_argument("--upscale", choices=["fast", "smooth"], default="fast",
+                        help="放大方式：fast 最近邻（默认），smooth 双线性（更柔和，4K 下耗时明显更高）")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="流水线模式：工作线程计算下一帧旋转投影的同时主线程绘制并提交本帧")
+    parser.add_argument("--projectors", metavar="COLSxROWS", type=parse_grid,
+                        help="多投影机拼接，如 3x1；此时 --size 为单台投影机的分辨率（见 projectors.py）")
+    parser.add_argument("--overlap", type=int, default=0, help="相邻投影机画面的重叠宽度（像素），在重叠带内边缘融合")
+    parser.add_argument("--blend-gamma", type=float, default=2.2, help="投影机的 gamma，用于融合带的亮度补偿")
+    parser.add_argument("--record", metavar="PATH",
+                        help="录制演出：.mp4/.mkv/.mov/.avi 交给 ffmpeg 编码，其他路径为图像序列目录（见 recorder.py）")
+    parser.add_argument("--record-format", choices=RECORD_FORMATS, help="录制格式（默认按路径扩展名选择 video 或 raw）")
+    parser.add_argument("--record-fps", type=float, default=30, help="录制帧率")
+    parser.add_argument("--record-buffers", type=int, default=8,
+                        help="录制缓冲帧数；写出跟不上时丢弃新帧并计数，演出本身不会变慢")
+    parser.add_argument("--no-asset-cache", action="store_true",
+                        help="不读写派生资源的磁盘缓存（点云采样、编队变换规划，见 asset_cache.py）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiler = FrameProfiler() if (args.profile or args.trace) else NULL_PROFILER
+    
+    pinned = None if args.quality == "auto" else QUALITY_NAMES.index(args.quality)
+    governor = QualityGovernor(target_fps=60, pinned=pinned)
+    
+    if args.no_asset_cache:
+        ASSET_CACHE.enabled = False
+    if args.projectors:
+        # 多投影机：窗口为各投影机画面并排的拼接桌面，场景绘制到重叠拼接后的虚拟画布
+        layout = ProjectorLayout(*args.projectors, args.size or (WIDTH, HEIGHT), args.overlap, args.blend_gamma)
+        display = Display(layout.output_size, args.fullscreen, CAPTION)
+        target = TiledOutput(layout, display.screen, args.render_scale, smooth=args.upscale == "smooth")
+    else:
+        display = Display(args.size or (None if args.fullscreen else (WIDTH, HEIGHT)), args.fullscreen, CAPTION)
+        target = ScaledRenderTarget(display.screen, args.render_scale, smooth=args.upscale == "smooth")
+    screen = display.screen
+    overlay = ProfilerOverlay(profiler) if args.profile else None  # 字体需在窗口打开（pygame.init）之后创建
+    
+    renderer = FrameRenderer(target.surface, count=args.particles, profiler=profiler,
+                             order=args.depth_order, formation=args.formation, glow=args.glow,
+                             pipeline=args.pipeline, hold=args.hold, morph=args.morph)
+    recorder = FrameRecorder(args.record, args.record_fps, args.record_format,
+                             args.record_buffers).start(screen) if args.record else None
     running = True
     start_time = time.time()
-    
-    # 旋转角度
-    angle_x = 0
-    angle_y = 0
-    angle_z = 0
+    last_time = 0.0
     
     while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
+        frame_start = time.perf_counter()
+        renderer.quality = governor.level
+        profiler.annotate(quality=governor.level.name)
+        
+        with profiler.stage("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                    elif event.key == pygame.K_F3 and overlay is not None:
+                        overlay.toggle()
         
+        # 下一帧的时间按上一帧的间隔预估（流水线模式提前计算用）
         current_time = time.time() - start_time
+        visible_count = renderer.draw(current_time, ahead=2 * current_time - last_time)
+        last_time = current_time
+        with profiler.stage("upscale"):
+            target.present()
+        if recorder is not None:
+            with profiler.stage("record"):
+                recorder.capture(screen, current_time)
+            profiler.annotate(**{f"record_{name}": value for name, value in recorder.counters().items()})
         
-        # 自动旋转（类似无人机灯光秀的旋转展示）
-        angle_y = current_time * 0.5  # 绕Y轴旋转（主要旋转）
-        angle_x = math.sin(current_time * 0.3) * 0.3  # 轻微的上下摆动
-        
-        # 1. 渲染背景
-        SCREEN.blit(FADE_SURFACE, (0, 0))
-        
-        # 2. 更新所有粒子（应用旋转和投影）
-        visible_particles = []
-        for p in particles:
-            p.rotate(angle_x, angle_y, angle_z)
-            if p.project(camera_distance=8.0):
-                p.update_color(current_time)
-                visible_particles.append(p)
-        
-        # 3. 按深度排序（从远到近绘制，避免遮挡问题）
-        visible_particles.sort(key=lambda p: p.depth, reverse=True)
-        
-        # 4. 绘制所有可见粒子
-        for p in visible_particles:
-            p.draw(SCREEN)
+        if overlay is not None:
+            with profiler.stage("hud"):
+                overlay.draw(screen, "drone")
         
         # 显示信息
-        pygame.display.set_caption(f"3D无人机灯光秀 - 粒子数: {len(visible_particles)} - 按ESC退出")
+        pygame.display.set_caption(f"3D无人机灯光秀 - 粒子数: {visible_count} - 按ESC退出")
         
-        pygame.display.flip()
-        CLOCK.tick(60)
-    
-    pygame.quit()
+        with profiler.stage("flip"):
+            pygame.display.flip()
+        governor.update(time.perf_counter() - frame_start)
+        with profiler.stage("tick"):
+            display.tick(60)
+        profiler.end_frame("drone")
+    
+    renderer.close()
+    if recorder is not None:
+        recorder.close()
+        print("录制：" + "  ".join(f"{k} {v}" for k, v in recorder.counters().items()), file=sys.stderr)
+    if args.trace:
+        profiler.dump(args.trace)
+    display.close()
 
 
 if __name__ == "__main__":
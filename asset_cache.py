@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+# 缓存格式版本：派生资源的生成算法改变时加一，旧缓存文件随之失效
+VERSION = 1
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "luogang")
+
+
+# --- 1. 派生资源的磁盘缓存 ---
+class AssetCache:
+    """把耗时的派生资源（采样后的点云、编队变换规划等）按参数存成 .npz，下次启动直接读取
+
+    缓存键是 (VERSION, 种类, 参数) 的摘要，参数需完整决定生成结果（用到随机数时应包含种子）。
+    缓存只是加速：目录不可写或文件损坏时照常重新生成。
+    """
+
+    def __init__(self, root=None, enabled=True):
+        self.root = root or os.environ.get("LUOGANG_CACHE_DIR", DEFAULT_DIR)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, kind, params):
+        text = json.dumps([VERSION, kind, params], sort_keys=True, default=str)
+        return os.path.join(self.root, f"{kind}-{hashlib.sha1(text.encode()).hexdigest()[:16]}.npz")
+
+    def get(self, kind, params, build):
+        """返回 build() 生成的数组字典（名称 -> 数组）；相同参数的结果从磁盘读取"""
+        if not self.enabled:
+            return build()
+        path = self.path(kind, params)
+        arrays = _load(path)
+        if arrays is not None:
+            self.hits += 1
+            return arrays
+        self.misses += 1
+        arrays = build()
+        _save(path, arrays)
+        return arrays
+
+
+def _load(path):
+    try:
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+        return None
+
+
+def _save(path, arrays):
+    # 先写临时文件再改名：多个离线渲染进程同时写入同一资源时不会读到半个文件
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+# 投影脚本共用的缓存（--no-asset-cache 时关闭）
+ASSET_CACHE = AssetCache()
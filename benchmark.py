@@ -0,0 +1,233 @@
+import os
+
+# 基准测试不打开窗口：在导入 pygame 之前切换到 SDL 的 dummy 视频驱动
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import gc
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pygame
+
+from offline_render import load_script
+from projectors import ProjectorLayout, TiledOutput, parse_grid
+from render_target import parse_size
+
+# 各场景默认测试的粒子数量
+DEFAULT_COUNTS = {
+    "voyage": [24, 240, 1000],  # 远航：N 条航线（每条 48 个点）+ 背景星点
+    "symbiosis": [150, 1500, 5000],  # 共生：分形骨架 + N 个有机粒子
+    "pulse": [20, 500, 2000],  # 脉动：建筑窗口 + N 个散射光斑
+    "drone": [800, 5000, 50000],  # 3D 无人机点云
+}
+DEFAULT_SIZES = [(1280, 720), (1920, 1080)]
+
+
+# --- 1. 场景驱动 ---
+def make_case(scenario, count, size, seed=0, glow="sprites", pipeline=False, points=0, projectors=None):
+    """构建一个场景的逐帧绘制函数 draw(frame) -> 本帧粒子数
+
+    points 为模拟的交互点（观众）数量，各自绕随机中心缓慢转圈（只影响“脉动”）。
+    projectors 为 (列数, 行数)：size 为单台投影机的分辨率，每帧还包括切片与边缘融合。
+    """
+    fps = 60
+    tiles = None
+    if projectors:
+        tiles = TiledOutput(ProjectorLayout(*projectors, size, overlap=size[1] // 6))
+        surface = tiles.surface
+    else:
+        surface = pygame.Surface(size)
+
+    if scenario == "drone":
+        module = load_script("3d")
+        renderer = module.FrameRenderer(surface, seed=seed, count=count, glow=glow, pipeline=pipeline)
+        return _presenting(lambda frame: renderer.render_at(frame / fps, frame, 1 / fps), tiles)
+
+    # 固定在同一场景内循环（每个场景周期重新进场一次，与实际演出一样在后台预热）
+    module = load_script("luogang")
+    renderer = module.FrameRenderer(surface, seed=seed, glow=glow, show=[scenario],
+                                    options={scenario: {"count": count}}, pipeline=pipeline)
+    rng = np.random.default_rng([seed, 2])
+    centers = rng.random((points, 2)) * size
+    phases = rng.random(points) * 2 * np.pi
+
+    def draw(frame):
+        if points:
+            angle = phases + frame / fps
+            renderer.interaction.set_points(centers[:, 0] + np.cos(angle) * 50, centers[:, 1] + np.sin(angle) * 50)
+        return renderer.render_at(frame / fps, frame, 1 / fps)
+
+    return _presenting(draw, tiles)
+
+
+def _presenting(draw, tiles):
+    if tiles is None:
+        return draw
+
+    def draw_tiles(frame):
+        particles = draw(frame)
+        tiles.present()
+        return particles
+
+    return draw_tiles
+
+
+def run_case(job):
+    """在独立子进程中运行一个测试用例（峰值内存互不影响）"""
+    scenario, count, size, glow, pipeline, points, projectors, frames, warmup = job
+    draw = make_case(scenario, count, size, glow=glow, pipeline=pipeline, points=points, projectors=projectors)
+    for frame in range(warmup):
+        draw(frame)
+
+    # 计时阶段（不开启 tracemalloc，避免干扰帧率）
+    gc_before = sum(stat["collections"] for stat in gc.get_stats())
+    times = np.empty(frames)
+    particles = 0
+    for i in range(frames):
+        started = time.perf_counter()
+        particles = draw(warmup + i)
+        times[i] = time.perf_counter() - started
+    gc_runs = sum(stat["collections"] for stat in gc.get_stats()) - gc_before
+
+    # 内存阶段：每帧的临时分配峰值，以及整个运行期间的 Python 堆峰值
+    mem_frames = max(1, frames // 4)
+    tracemalloc.start()
+    transient = np.empty(mem_frames)
+    for i in range(mem_frames):
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        draw(warmup + frames + i)
+        _, peak = tracemalloc.get_traced_memory()
+        transient[i] = peak - base
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "scenario": scenario,
+        "count": count,
+        "size": f"{size[0]}x{size[1]}",
+        "glow": glow,
+        "pipeline": pipeline,
+        "points": points,
+        "projectors": f"{projectors[0]}x{projectors[1]}" if projectors else None,
+        "frames": frames,
+        "particles": int(particles),
+        "fps": round(frames / times.sum(), 2),
+        "frame_ms_p50": round(float(np.percentile(times, 50)) * 1000, 3),
+        "frame_ms_p95": round(float(np.percentile(times, 95)) * 1000, 3),
+        "gc_runs_per_1k_frames": round(gc_runs * 1000 / frames, 2),
+        "alloc_kb_per_frame": round(float(np.median(transient)) / 1024, 1),
+        "peak_heap_mb": round(heap_peak / 2**20, 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+    return result
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows 上没有 resource 模块
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2**20 if sys.platform == "darwin" else rss / 1024
+
+
+# --- 2. 结果对比 ---
+def compare(baseline, current, tolerance):
+    """与旧结果逐项对比，返回帧率下降超过 tolerance 的用例"""
+    key = lambda r: (r["scenario"], r["count"], r["size"], r.get("glow", "sprites"),
+                     r.get("pipeline", False), r.get("points", 0), r.get("projectors"))
+    old = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        before = old.get(key(r))
+        if before is None:
+            continue
+        ratio = r["fps"] / before["fps"]
+        flag = ""
+        if ratio < 1 - tolerance:
+            regressions.append(r)
+            flag = "  <-- 退化"
+        print(f"{r['scenario']:<10} {r['count']:>6} {r['size']:>10} {r['glow']:>7}  "
+              f"{before['fps']:8.1f} -> {r['fps']:8.1f} fps ({ratio:6.2%}){flag}")
+    return regressions
+
+
+# --- 3. 命令行入口 ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无窗口性能基准：逐场景、逐粒子数、逐分辨率测量")
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_COUNTS),
+                        help="逗号分隔：voyage, symbiosis, pulse, drone")
+    parser.add_argument("--counts", help="逗号分隔的粒子数量，覆盖各场景的默认值")
+    parser.add_argument("--sizes", help="逗号分隔的分辨率，如 1280x720,3840x2160")
+    parser.add_argument("--glow", default="sprites", help="逗号分隔的外发光方式：sprites, bloom")
+    parser.add_argument("--pipeline", action="store_true", help="以流水线模式运行（模拟与绘制重叠）")
+    parser.add_argument("--points", type=int, default=0, help="模拟的交互点（观众）数量，用于“脉动”")
+    parser.add_argument("--projectors", metavar="COLSxROWS", type=parse_grid,
+                        help="多投影机拼接输出，如 3x1（--sizes 为单台投影机的分辨率，重叠为高度的 1/6）")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--out", help="结果 JSON 输出路径（默认打印到标准输出）")
+    parser.add_argument("--compare", metavar="BASELINE", help="与之前的结果 JSON 对比")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="允许的帧率下降比例")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",")] if args.sizes else DEFAULT_SIZES
+    jobs = []
+    for scenario in args.scenarios.split(","):
+        counts = [int(c) for c in args.counts.split(",")] if args.counts else DEFAULT_COUNTS[scenario]
+        for count in counts:
+            for size in sizes:
+                for glow in args.glow.split(","):
+                    jobs.append((scenario, count, size, glow, args.pipeline, args.points, args.projectors,
+                                 args.frames, args.warmup))
+
+    results = []
+    # 每个用例一个新进程，峰值内存与缓存状态互不干扰
+    ctx = multiprocessing.get_context("spawn")
+    for job in jobs:
+        with ctx.Pool(1) as pool:
+            result = pool.apply(run_case, (job,))
+            # SDL 会接管 SIGTERM，需让子进程正常退出
+            pool.close()
+            pool.join()
+        print(f"{result['scenario']:<10} {result['count']:>6} {result['size']:>10} {result['glow']:>7}  "
+              f"{result['fps']:8.1f} fps  p95 {result['frame_ms_p95']:7.2f} ms  "
+              f"{result['alloc_kb_per_frame']:8.1f} KB/帧  峰值 {result['peak_rss_mb']:.0f} MB",
+              file=sys.stderr)
+        results.append(result)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
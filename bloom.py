@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+import pygame
+
+# 外发光方式：sprites 为逐粒子贴图，bloom 为整帧一次的降分辨率模糊
+GLOW_MODES = ("sprites", "bloom")
+
+
+# --- 1. 降分辨率泼溅 + 可分离模糊（替代逐粒子的外发光贴图）---
+class BloomPass:
+    """把所有光点按能量泼溅到低分辨率浮点累积缓冲，整帧做一次可分离模糊后叠加到画面
+
+    外发光的开销只取决于画面尺寸（最终放大与叠加），与粒子数量无关。
+    累积缓冲高度约为 working_height（4K 输出时也只有约 320x180），
+    按 pygame.surfarray 的 (宽, 高, 3) 布局存放；
+    模糊为 passes 次盒式模糊（近似高斯），逐轴原地进行，不分配新数组。
+    """
+
+    def __init__(self, size, radius=8.0, working_height=180, passes=2, intensity=1.0, smooth=True):
+        self.size = size
+        width, height = size
+        downscale = self.downscale = max(1, round(height / working_height))
+        self.passes = passes
+        self.intensity = intensity
+        self.smooth = smooth
+        self.small_size = (max(1, width // downscale), max(1, height // downscale))
+        w, h = self.small_size
+        self.radius = max(1, round(radius / downscale))  # 模糊半径（低分辨率像素）
+
+        self.accum = np.zeros((w, h, 3), dtype=np.float32)
+        self._blurred = np.empty_like(self.accum)
+        self._pixels = np.empty((w, h, 3), dtype=np.uint8)
+        self._small = pygame.Surface(self.small_size)
+        self._large = pygame.Surface(size)
+
+        # 每个轴的窗口长度倒数（边缘处窗口截断）
+        self._norms = []
+        for n in (w, h):
+            i = np.arange(n)
+            count = np.minimum(i + self.radius + 1, n) - np.maximum(i - self.radius, 0)
+            self._norms.append((1.0 / count).astype(np.float32))
+
+    def splat(self, x, y, rgb, weight):
+        """累加一批光点：x, y 为画面像素坐标，weight 为每个光点的能量（像素面积 × 不透明度）"""
+        w, h = self.small_size
+        if len(x) == 0:
+            return
+        inv = 1.0 / self.downscale
+        xi = (x * inv).astype(np.int64)
+        yi = (y * inv).astype(np.int64)
+        inside = (xi >= 0) & (xi < w) & (yi >= 0) & (yi < h)  # 画面外的光点不计入（避免堆在边缘）
+        index = (xi * h + yi)[inside]
+        # 缩小后每个低分辨率像素覆盖 downscale² 个原像素
+        energy = np.asarray(weight, dtype=np.float32)[inside] * (inv * inv)
+        rgb = rgb[inside]
+        flat = self.accum.reshape(-1, 3)
+        for c in range(3):
+            flat[:, c] += np.bincount(index, weights=energy * rgb[:, c], minlength=w * h)
+
+    def _blur_axis(self, src, dst, axis):
+        """沿 axis 做一次盒式模糊：原地累加 2×radius 个平移切片，再除以窗口长度"""
+        if axis == 1:
+            src, dst = src.swapaxes(0, 1), dst.swapaxes(0, 1)
+        dst[...] = src
+        for k in range(1, min(self.radius, len(src) - 1) + 1):
+            dst[k:] += src[:-k]
+            dst[:-k] += src[k:]
+        dst *= self._norms[axis].reshape(-1, 1, 1)
+
+    def apply(self, surface):
+        """模糊累积缓冲并以加法混合叠加到 surface，之后清空缓冲供下一帧泼溅"""
+        a, b = self.accum, self._blurred
+        for _ in range(self.passes):
+            self._blur_axis(a, b, 0)
+            self._blur_axis(b, a, 1)
+        a *= self.intensity
+        np.minimum(a, 255, out=a)
+        np.copyto(self._pixels, a, casting="unsafe")
+        a.fill(0)
+        pygame.surfarray.blit_array(self._small, self._pixels)
+
+        if self.smooth:
+            pygame.transform.smoothscale(self._small, self.size, self._large)
+        else:
+            pygame.transform.scale(self._small, self.size, self._large)
+        surface.blit(self._large, (0, 0), special_flags=pygame.BLEND_ADD)
+
+
+def disc_energy(radius, alpha):
+    """半径为 radius、不透明度为 alpha 的圆形光斑的能量（等效满亮度像素数）"""
+    return math.pi * np.square(radius) * (np.asarray(alpha, dtype=np.float32) / 255)
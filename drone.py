@@ -0,0 +1,352 @@
+import math
+import os
+
+import numpy as np
+import pygame
+
+from asset_cache import ASSET_CACHE
+from bloom import BloomPass, disc_energy
+from formation import load_formation, sphere_points
+from mesh_sampler import load_obj, mesh_formation
+from morph import MorphSequence
+from pipeline import SimulationPipeline
+from pointcloud import PointCloud, depth_order
+from profiler import NULL_PROFILER
+from quality import QUALITY_LEVELS
+from scene import Scene, register_scene
+from sprite_cache import GlowSpriteCache, SpriteBatch
+from trail import TrailBuffer
+
+# --- 1. 颜色配置 (发光效果配色) ---
+COLOR_WHITE = (255, 255, 255)  # 白色光点
+COLOR_BLUE = (150, 200, 255)  # 蓝色光点
+COLOR_PINK = (255, 200, 255)  # 粉红色光点
+COLOR_CYAN = (150, 255, 255)  # 青色光点
+COLOR_BG = (5, 10, 40)  # 深蓝背景
+
+PARTICLE_COUNT = 800  # 3D点云需要更多粒子
+FADE_ALPHA = 15  # 拖尾效果
+
+# 光点与外发光贴图缓存（与 luogang_projection 共用同一实现）
+GLOW_CACHE = GlowSpriteCache(capacity=2048)
+
+# --- 2. 3D数学参数 ---
+# 旋转与透视投影由 pointcloud.PointCloud 整批完成，这里只保留相机参数
+FOV = 500  # 视野参数
+CAMERA_DISTANCE = 8.0
+
+# 调色板（按 color_variant 取色）
+PALETTE = [COLOR_WHITE, COLOR_BLUE, COLOR_CYAN, COLOR_PINK]
+
+# --- 3. 飞机3D点云定义 ---
+def get_airplane_3d_points():
+    """定义飞机的3D点云（点云技术，类似无人机灯光秀）"""
+    points = []
+    
+    # 从2D轮廓扩展为3D点云
+    # 机头部分（圆形，增加Z轴厚度）
+    for i in range(20):
+        angle = math.pi * (i / 20)
+        for z in [-0.03, 0, 0.03]:  # 3层深度
+            x = 0.4 + math.cos(angle) * 0.08
+            y = math.sin(angle) * 0.06
+            points.append((x, y, z))
+    
+    # 机身上边缘（增加Z轴变化）
+    for i in range(30):
+        for z_offset in [-0.02, 0, 0.02]:
+            x = 0.32 - (i / 30) * 0.92
+            y = 0.06 - (i / 30) * 0.02
+            z = z_offset
+            points.append((x, y, z))
+    
+    # 垂直尾翼
+    for i in range(15):
+        x = -0.62 - (i / 15) * 0.05
+        y = 0.06 + (i / 15) * 0.22
+        for z in [-0.02, 0, 0.02]:
+            points.append((x, y, z))
+    
+    # 垂直尾翼顶部
+    points.append((-0.67, 0.28, 0))
+    points.append((-0.65, 0.3, 0))
+    
+    # 机身下边缘
+    for i in range(30):
+        for z_offset in [-0.02, 0, 0.02]:
+            x = -0.6 + (i / 30) * 0.92
+            y = 0.04 - (i / 30) * 0.10
+            z = z_offset
+            points.append((x, y, z))
+    
+    # 机翼（3D厚度）
+    # 右翼
+    for i in range(25):
+        x = 0.0 + (i / 25) * 0.35
+        y = 0.02 - (i / 25) * 0.25
+        for z in [-0.15, -0.1, -0.05, 0, 0.05, 0.1, 0.15]:  # 机翼有厚度
+            points.append((x, y, z))
+    
+    # 左翼
+    for i in range(25):
+        x = -0.3 - (i / 25) * 0.3
+        y = 0.01 - (i / 25) * 0.22
+        for z in [-0.15, -0.1, -0.05, 0, 0.05, 0.1, 0.15]:
+            points.append((x, y, z))
+    
+    # 引擎（3D圆形）
+    engine_points = [
+        (0.15, -0.18, 0),
+        (-0.15, -0.17, 0),
+    ]
+    for ep in engine_points:
+        for i in range(12):
+            angle = 2 * math.pi * (i / 12)
+            for z_offset in [-0.04, 0, 0.04]:
+                x = ep[0] + math.cos(angle) * 0.04
+                y = ep[1] + math.sin(angle) * 0.04
+                z = ep[2] + z_offset
+                points.append((x, y, z))
+    
+    return points
+
+
+def sample_points(points_3d, count=None, rng=None, variants=None):
+    """从点云均匀采样 count 个点，返回 (坐标, 颜色变体)，点序已打乱
+
+    points_3d 可以是点列表，也可以是编队文件的内存映射数组；
+    variants 为每个点的颜色变体，缺省时按采样序号循环分配。
+    """
+    count = PARTICLE_COUNT if count is None else count
+    rng = rng if rng is not None else np.random.default_rng()
+    points = np.asarray(points_3d, dtype=np.float32)
+    
+    # 均匀采样点云
+    step = max(1, len(points) // count)
+    index = np.arange(0, len(points), step)[:count]
+    color_variants = index % 4 if variants is None else np.asarray(variants)[index]
+    
+    # 补充粒子
+    missing = count - len(index)
+    if missing > 0:
+        extra = rng.integers(0, len(points), missing)
+        index = np.concatenate([index, extra])
+        extra_variants = rng.integers(0, 4, missing) if variants is None else np.asarray(variants)[extra]
+        color_variants = np.concatenate([color_variants, extra_variants])
+    
+    # 打乱顺序：任意前缀都是均匀子集，画质调节时只需处理前 N 个点
+    shuffle = rng.permutation(len(index))
+    index, color_variants = index[shuffle], color_variants[shuffle]
+    return points[index], color_variants
+
+
+def load_points(source, count=None, rng=None):
+    """编队来源 -> (点坐标, 颜色变体或 None)
+
+    None 或 "airplane" 为内置飞机，"sphere" 为内置球面，.obj 为网格模型
+    （按 count 个点做泊松圆盘采样，见 mesh_sampler.py），其余按编队文件（.lgf）路径加载。
+    """
+    if source is None or source == "airplane":
+        return get_airplane_3d_points(), None
+    if source == "sphere":
+        return sphere_points(), None
+    if source.lower().endswith(".obj"):
+        count = PARTICLE_COUNT if count is None else count
+        return mesh_formation(*load_obj(source), count, rng), None
+    loaded = load_formation(source)
+    return loaded.points, loaded.variants
+
+
+def formation_key(source):
+    """编队来源的缓存键：内置编队为名称，编队文件为 (绝对路径, 修改时间, 大小)"""
+    if source is None or source in ("airplane", "sphere"):
+        return source
+    stat = os.stat(source)
+    return [os.path.abspath(source), stat.st_mtime_ns, stat.st_size]
+
+
+def draw_point_cloud(surface, cloud, order, core_batch, glow_batch, unit=1.0, core_flags=0,
+                     quality=QUALITY_LEVELS[0], bloom=None):
+    """按 order 顺序绘制点云：主光点默认不透明覆盖，外发光整批叠加
+
+    core_flags 为 BLEND_ADD 时主光点也改为加法混合，此时绘制顺序无关紧要；
+    quality 决定外发光半径与是否绘制外发光。
+    给出 bloom 时外发光只泼溅到其累积缓冲，由调用方每帧统一模糊叠加。
+    """
+    x, y, rgb = cloud.x2d[order], cloud.y2d[order], cloud.rgb[order]
+    size = cloud.size[order] * unit
+    
+    # 绘制主光点
+    core_batch.add_arrays(x, y, size, rgb, np.full(len(order), 255), extent=2.0)
+    core_batch.flush(surface, core_flags)
+    
+    # 外发光效果（根据深度调整透明度）
+    if not quality.glow:
+        return
+    glow_alpha = (80 * (1 - cloud.depth[order] / 10)).astype(np.int32)
+    glowing = glow_alpha > 0
+    glow_size = size[glowing] * (2 * quality.glow_radius)
+    if bloom is not None:
+        bloom.splat(x[glowing], y[glowing], rgb[glowing], disc_energy(glow_size, glow_alpha[glowing]))
+        return
+    glow_batch.add_arrays(x[glowing], y[glowing], glow_size, rgb[glowing], glow_alpha[glowing], extent=2.0)
+    glow_batch.flush(surface, pygame.BLEND_ADD)
+
+
+# --- 4. 场景插件 ---
+@register_scene
+class DroneScene(Scene):
+    """3D 无人机编队：飞机（或编队文件）点云的旋转展示
+
+    setup 中完成点云采样（耗时部分），每帧只做整批旋转、投影、着色与深度排序。
+    投影结果双缓冲：update 写入后台点云，render 绘制前台点云。
+    给出多个编队时，setup 还会规划相邻编队之间的点对（见 morph.py），
+    每个编队停留 hold 秒，再用 morph 秒变换到下一个，循环往复。
+    """
+
+    id = "drone"
+    name = "无人机编队"
+    background = COLOR_BG
+    fade_alpha = FADE_ALPHA
+    double_buffered = True
+
+    def __init__(self, width, height, count=None, order="bucket", formation=None, hold=6.0, morph=3.0, seed=0):
+        super().__init__(width, height)
+        self.count = count
+        # 点云采样只取决于编队、点数与 seed（可缓存）；闪烁相位仍取自 setup 的随机数
+        self.seed = seed
+        self.order = order  # 深度排序方式，见 pointcloud.depth_order
+        # 编队来源（见 load_points），可为单个或按顺序变换的多个，缺省使用内置飞机
+        self.formations = list(formation) if isinstance(formation, (list, tuple)) else [formation]
+        self.hold = hold
+        self.morph = morph
+        self.sequence = None
+        self.cloud = self.back = None
+        self.draw_order = self.back_order = None
+        self.visible_count = self.back_count = 0
+        self.core_batch = SpriteBatch(GLOW_CACHE)
+        self.glow_batch = SpriteBatch(GLOW_CACHE)
+
+    def setup(self, rng):
+        # 获取3D点云并生成3D粒子（采样与变换规划的结果缓存在磁盘上，见 asset_cache.py）
+        params = {"formations": [formation_key(source) for source in self.formations],
+                  "count": self.count, "seed": self.seed}
+        if len(self.formations) == 1:
+            assets = ASSET_CACHE.get("drone-cloud", params, self._sample)
+            self.cloud = PointCloud(assets["points"], assets["variants"], PALETTE, rng=rng)
+        else:
+            assets = ASSET_CACHE.get("drone-morph", params, self._plan)
+            self.sequence = MorphSequence.from_stages(assets["stages"], assets["variants"], assets["wrap"],
+                                                      self.hold, self.morph)
+            self.cloud = PointCloud(self.sequence.stages[0].copy(), self.sequence.variants[0], PALETTE, rng=rng)
+        self.back = self.cloud.twin()
+
+    def _sample(self, source=None, rng=None):
+        rng = rng if rng is not None else np.random.default_rng(self.seed)
+        points, variants = load_points(self.formations[0] if source is None else source, self.count, rng)
+        points, variants = sample_points(points, self.count, rng, variants)
+        return {"points": points * 200, "variants": variants}
+
+    def _plan(self):
+        # 各编队采样到相同点数，再规划相邻编队之间的变换
+        rng = np.random.default_rng(self.seed)
+        samples = [self._sample(source, rng) for source in self.formations]
+        sequence = MorphSequence([sample["points"] for sample in samples],
+                                 [sample["variants"] for sample in samples])
+        return {"stages": np.stack(sequence.stages), "variants": np.stack(sequence.variants),
+                "wrap": sequence.wrap}
+
+    def update(self, scene_time, rng=None):
+        cloud = self.back
+        if self.sequence is not None:
+            # 编队变换：坐标原地插值（两份点云共享坐标数组，前台只读取投影结果）
+            cloud.set_variants(self.sequence.evaluate(scene_time, cloud.positions))
+        
+        # 自动旋转（类似无人机灯光秀的旋转展示）
+        angle_y = scene_time * 0.5  # 绕Y轴旋转（主要旋转）
+        angle_x = math.sin(scene_time * 0.3) * 0.3  # 轻微的上下摆动
+        angle_z = 0
+        
+        # 更新所有粒子（整批旋转、投影与着色）
+        limit = int(len(cloud) * self.quality.particles)
+        self.back_count = cloud.project(angle_x, angle_y, angle_z, CAMERA_DISTANCE,
+                                        FOV * self.unit, self.width, self.height, limit)
+        cloud.shade(scene_time, limit)
+        
+        # 按深度排序（从远到近绘制，避免遮挡问题；全加法混合时无需排序）
+        self.back_order = depth_order(cloud.depth, cloud.visible, self.order)
+
+    def swap(self):
+        self.cloud, self.back = self.back, self.cloud
+        self.draw_order, self.back_order = self.back_order, self.draw_order
+        self.visible_count, self.back_count = self.back_count, self.visible_count
+
+    def render(self, surface, bloom=None):
+        core_flags = pygame.BLEND_ADD if self.order == "additive" else 0
+        draw_point_cloud(surface, self.cloud, self.draw_order, self.core_batch, self.glow_batch,
+                         self.unit, core_flags, self.quality, bloom)
+        return self.visible_count
+
+    def teardown(self):
+        self.cloud = self.back = None
+
+
+# --- 5. 帧渲染（实时窗口与离线渲染共用）---
+class FrameRenderer:
+    """把无人机点云绘制到任意尺寸的目标表面上（实时窗口与离线渲染共用）
+
+    画面只取决于时间与 seed（点云采样和闪烁相位均由 seed 决定），
+    长曝光拖尾需要按时间顺序连续绘制。
+    pipeline=True 时下一帧的旋转与投影在工作线程上计算，与本帧的绘制重叠。
+    """
+
+    def __init__(self, surface, seed=None, count=None, profiler=NULL_PROFILER, order="bucket",
+                 formation=None, glow="sprites", pipeline=False, hold=6.0, morph=3.0):
+        self.surface = surface
+        self.profiler = profiler
+        self.width, self.height = surface.get_size()
+        self.scene = DroneScene(self.width, self.height, count, order, formation, hold, morph, seed or 0)
+        self.scene.setup(np.random.default_rng(seed))
+        
+        # 长曝光拖尾
+        self.trail = TrailBuffer(surface, COLOR_BG, FADE_ALPHA)
+        self.quality = QUALITY_LEVELS[0]
+        self.pipeline = SimulationPipeline() if pipeline else None
+        
+        # 外发光方式：sprites 为逐光点贴图，bloom 为整帧一次的降分辨率模糊（开销与光点数无关）
+        self.bloom = BloomPass((self.width, self.height), radius=8 * self.scene.unit) if glow == "bloom" else None
+
+    def draw(self, current_time, ahead=None):
+        """绘制 current_time 时刻的一帧，返回可见粒子数
+
+        流水线模式下 ahead 为下一帧的时间，随即提交到工作线程计算。
+        """
+        scene = self.scene
+        scene.quality = self.quality
+        profiler = self.profiler
+        pipeline = self.pipeline
+        
+        with profiler.stage("generate"):
+            if pipeline is None or not pipeline.collect(scene):
+                scene.update(current_time)
+                scene.swap()
+            if pipeline is not None and ahead is not None:
+                pipeline.submit(scene, scene.update, ahead)
+        with profiler.stage("fade"):
+            self.trail.fade()
+        with profiler.stage("draw"):
+            bloom = self.bloom if self.quality.glow else None
+            visible_count = scene.render(self.surface, bloom)
+        if bloom is not None:
+            with profiler.stage("bloom"):
+                bloom.apply(self.surface)
+        return visible_count
+
+    def render_at(self, t, frame, dt=None):
+        """按固定时间轴绘制第 frame 帧（dt 为帧间隔，流水线模式用）"""
+        return self.draw(t, None if dt is None else t + dt)
+
+    def close(self):
+        if self.pipeline is not None:
+            self.pipeline.shutdown()
+        self.scene.teardown()
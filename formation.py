@@ -0,0 +1,132 @@
+import argparse
+import os
+
+import numpy as np
+
+from mesh_sampler import load_obj, mesh_formation
+
+# --- 1. 编队文件格式（.lgf）---
+# 32 字节文件头，之后依次为：
+#   float32 xyz   count × 3（小端，单位坐标，未缩放）
+#   uint8 variant count      （颜色变体，对应调色板索引）
+# 数据区 4 字节对齐，np.memmap 可直接映射，无需逐点解析。
+MAGIC = b"LGFORMAT"
+VERSION = 1
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("count", "<u4"),
+    ("reserved", "<u4", (4,)),
+])
+
+
+class Formation:
+    """内存映射的编队点云：points 为 (N, 3) float32，variants 为 (N,) uint8"""
+
+    def __init__(self, points, variants, path=None):
+        self.points = points
+        self.variants = variants
+        self.path = path
+
+    def __len__(self):
+        return len(self.points)
+
+
+def save_formation(path, points, variants=None):
+    """写入编队文件；未给出颜色变体时按点序号循环分配 4 种颜色"""
+    points = np.ascontiguousarray(points, dtype="<f4").reshape(-1, 3)
+    count = len(points)
+    if variants is None:
+        variants = np.arange(count) % 4
+    variants = np.asarray(variants, dtype=np.uint8)
+    if len(variants) != count:
+        raise ValueError(f"颜色变体数量 {len(variants)} 与点数 {count} 不一致")
+
+    header = np.zeros((), dtype=HEADER)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["count"] = count
+    with open(path, "wb") as f:
+        f.write(header.tobytes())
+        f.write(points.tobytes())
+        f.write(variants.tobytes())
+
+
+def load_formation(path):
+    """以只读内存映射方式打开编队文件（不复制数据，不创建逐点对象）"""
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) == 0 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{path} 不是编队文件")
+    if header["version"][0] != VERSION:
+        raise ValueError(f"{path} 的版本 {header['version'][0]} 不受支持")
+    count = int(header["count"][0])
+
+    offset = HEADER.itemsize
+    points = np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=(count, 3))
+    variants = np.memmap(path, dtype=np.uint8, mode="r", offset=offset + count * 12, shape=(count,))
+    return Formation(points, variants, path)
+
+
+def sphere_points(count=2000, radius=0.4):
+    """内置球面编队：斐波那契螺旋均匀分布的 count 个点（与内置飞机同一量级的单位坐标）"""
+    i = np.arange(count) + 0.5
+    z = 1 - 2 * i / count
+    r = np.sqrt(1 - z * z)
+    theta = np.pi * (1 + 5 ** 0.5) * i
+    return (np.column_stack([r * np.cos(theta), z, r * np.sin(theta)]) * radius).astype(np.float32)
+
+
+# --- 2. 转换工具 ---
+def convert_airplane(path):
+    """把 drone.py 中的内置飞机点云导出为编队文件"""
+    from drone import get_airplane_3d_points  # drone.py 依赖本模块，延迟导入
+
+    points = np.array(get_airplane_3d_points(), dtype=np.float32)
+    save_formation(path, points)
+    return len(points)
+
+
+def convert_mesh(path, out, count=20000, seed=0):
+    """把 OBJ 网格采样为 count 个间距均匀的点并保存为编队文件"""
+    points = mesh_formation(*load_obj(path), count, np.random.default_rng(seed))
+    save_formation(out, points)
+    return len(points)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="编队点云文件（.lgf）工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("airplane", help="导出 3d.py 内置的飞机点云")
+    p.add_argument("out")
+    p = sub.add_parser("sphere", help="导出内置球面编队")
+    p.add_argument("out")
+    p.add_argument("--count", type=int, default=2000)
+    p = sub.add_parser("mesh", help="把 OBJ 网格模型采样为编队（泊松圆盘分布）")
+    p.add_argument("obj")
+    p.add_argument("out")
+    p.add_argument("--count", type=int, default=20000)
+    p.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("info", help="查看编队文件")
+    p.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "airplane":
+        count = convert_airplane(args.out)
+        print(f"{args.out}: {count} 点")
+    elif args.command == "sphere":
+        save_formation(args.out, sphere_points(args.count))
+        print(f"{args.out}: {args.count} 点")
+    elif args.command == "mesh":
+        count = convert_mesh(args.obj, args.out, args.count, args.seed)
+        print(f"{args.out}: {count} 点")
+    else:
+        formation = load_formation(args.path)
+        points = np.asarray(formation.points)
+        print(f"{args.path}: {len(formation)} 点, {os.path.getsize(args.path)} 字节")
+        if len(formation):
+            print(f"范围 min {points.min(axis=0)} max {points.max(axis=0)}")
+            print(f"颜色变体 {np.bincount(formation.variants, minlength=4).tolist()}")
+
+
+if __name__ == "__main__":
+    main()
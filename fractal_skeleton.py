@@ -0,0 +1,136 @@
+import math
+import numpy as np
+
+from scene import REFERENCE_HEIGHT
+
+
+# --- 1. 分形骨架（每次进入场景只计算一次）---
+class FractalSkeleton:
+    """共生场景的分形树骨架
+
+    进场时一次性生成所有分支线段，并沿线段按固定间距展开成点，
+    每个点带有出现时间（reveal time）。点按出现时间排序存放，
+    因此每帧只需二分查找出已经“长出”的前缀即可，无需重新递归。
+    """
+
+    def __init__(self, width, height, depth=6, num_main_branches=8,
+                 branch_angle=math.pi / 7, growth_time=4.0, spacing=5.0, rng=None):
+        self.width = width
+        self.height = height
+        self.unit = height / REFERENCE_HEIGHT
+        self.depth = depth
+        self.num_main_branches = num_main_branches
+        self.branch_angle = branch_angle
+        self.growth_time = growth_time
+        self.spacing = spacing * self.unit
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._build()
+
+    def _build(self):
+        # 信标塔中心位置
+        tower_x = self.width / 2
+        tower_base_y = self.height * 0.95
+        tower_height = self.height * 0.85
+        trunk_height = tower_height * 0.35  # 树干长度为塔高的35%
+        self.tower_x = tower_x
+
+        # 生长时间线：树干占前30%，之后每一层分支依次展开
+        trunk_time = self.growth_time * 0.3
+        level_time = (self.growth_time - trunk_time) / self.depth
+
+        # 树干：从底部中心向上
+        trunk_steps = int(trunk_height / self.spacing)
+        i = np.arange(trunk_steps)
+        frac = i / max(1, trunk_steps)
+        intensity = (60 + frac * 100).astype(np.int32)
+        self.trunk_index = i.astype(np.float32)
+        self.trunk_y = (tower_base_y - i * self.spacing).astype(np.float32)
+        self.trunk_size = (3.5 - frac * 1.5).astype(np.float32)
+        self.trunk_rgb = _green_rgb(intensity, 30)
+        self.trunk_reveal = frac * trunk_time
+
+        # 分支线段：逐层向量化生成（每层分裂为左右两支）
+        n = self.num_main_branches
+        offsets = np.arange(n) / n * math.pi * 2
+        angle = -math.pi / 2 + np.cos(offsets) * 0.6  # 让分支均匀分散（像树冠一样）
+        length = trunk_height * (0.4 + self.rng.random(n) * 0.2)
+        sx = np.full(n, tower_x)
+        sy = np.full(n, tower_base_y - trunk_height)
+
+        segments = []
+        for level in range(self.depth):
+            keep = length >= self.spacing
+            sx, sy, angle, length = sx[keep], sy[keep], angle[keep], length[keep]
+            if len(sx) == 0:
+                break
+            ex = sx + np.cos(angle) * length
+            ey = sy + np.sin(angle) * length
+            segments.append((sx, sy, ex, ey, length, level))
+
+            # 子分支：左右各偏转 0.8 倍分支角，长度衰减 0.75
+            spread = self.branch_angle * 0.8
+            sx, sy = np.repeat(ex, 2), np.repeat(ey, 2)
+            angle = (np.repeat(angle, 2) + np.tile([-spread, spread], len(angle)))
+            length = np.repeat(length, 2) * 0.75
+
+        # 将线段沿长度展开成点，并记录每个点的出现时间
+        xs, ys, sizes, rgbs, alphas, reveals = [], [], [], [], [], []
+        for sx, sy, ex, ey, length, level in segments:
+            steps = np.maximum(2, (length / self.spacing).astype(np.int64))
+            seg = np.repeat(np.arange(len(steps)), steps)
+            first = np.cumsum(steps) - steps
+            t = (np.arange(steps.sum()) - first[seg]) / (steps[seg] - 1)
+
+            # 深度映射回原先 3 层树的配色区间，加深后颜色依旧协调
+            d = 3 - 2 * level / max(1, self.depth - 1)
+            green_val = (80 + d * 30 + t * 60).astype(np.int32)
+
+            xs.append(sx[seg] + (ex - sx)[seg] * t)
+            ys.append(sy[seg] + (ey - sy)[seg] * t)
+            sizes.append(np.full(len(t), 2 + d * 0.3))
+            rgbs.append(_green_rgb(green_val, 40))
+            alphas.append(np.full(len(t), 150 + d * 20))
+            reveals.append(trunk_time + (level + t) * level_time)
+
+        if xs:
+            reveal = np.concatenate(reveals)
+            order = np.argsort(reveal, kind="stable")
+            self.x = np.concatenate(xs)[order].astype(np.float32)
+            self.y = np.concatenate(ys)[order].astype(np.float32)
+            self.size = np.concatenate(sizes)[order].astype(np.float32)
+            self.rgb = np.concatenate(rgbs)[order]
+            self.alpha = np.concatenate(alphas)[order].astype(np.int32)
+            self.reveal = reveal[order]
+        else:
+            self.x = self.y = self.size = self.reveal = np.zeros(0, dtype=np.float32)
+            self.rgb = np.zeros((0, 3), dtype=np.uint8)
+            self.alpha = np.zeros(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.trunk_y) + len(self.x)
+
+    def emit(self, buffer, scene_time, budget=None):
+        """把 scene_time 时刻已长出的点写入粒子缓冲
+
+        budget 限制写入的点数：超出时在已长出的点中均匀抽取 budget 个（骨架形状保持完整）。
+        """
+        n = np.searchsorted(self.trunk_reveal, scene_time, side="right")
+        m = np.searchsorted(self.reveal, scene_time, side="right")
+        if budget is not None and n + m > budget:
+            picked = (np.arange(max(0, budget)) * ((n + m) / max(1, budget))).astype(np.intp)
+            trunk, branch = picked[picked < n], picked[picked >= n] - n
+        else:
+            trunk, branch = slice(0, n), slice(0, m)
+
+        i = self.trunk_index[trunk]
+        buffer.append(self.tower_x + np.sin(scene_time * 0.3 + i * 0.05) * (3 * self.unit),  # 轻微摆动
+                      self.trunk_y[trunk], self.trunk_size[trunk], self.trunk_rgb[trunk], 200)
+        buffer.append(self.x[branch], self.y[branch], self.size[branch], self.rgb[branch], self.alpha[branch])
+
+def _green_rgb(green_val, blue_offset):
+    """绿色系配色：(20, g, g/2 + offset)"""
+    rgb = np.empty((len(green_val), 3), dtype=np.uint8)
+    rgb[:, 0] = 20
+    rgb[:, 1] = np.minimum(255, green_val)
+    rgb[:, 2] = np.minimum(255, green_val // 2 + blue_offset)
+    return rgb
@@ -0,0 +1,114 @@
+import numpy as np
+
+from scene import REFERENCE_HEIGHT
+
+
+# --- 1. 均匀网格空间哈希（每帧重建）---
+class SpatialHash:
+    """把粒子按所在格子做一次计数排序，查询时只访问交互点附近的格子
+
+    格子边长为交互半径的 1 / reach 时，每个交互点只需检查周围 (2·reach + 1)² 个格子。
+    重建与查询都是整列运算，开销与粒子数、候选对数成正比，
+    而不是粒子数 × 交互点数。画面外的粒子归入边缘格子（距离判断时自然排除）。
+    """
+
+    def __init__(self, cell_size, width, height):
+        self.cell_size = float(cell_size)
+        self.cols = max(1, int(np.ceil(width / self.cell_size)))
+        self.rows = max(1, int(np.ceil(height / self.cell_size)))
+        self.order = np.zeros(0, dtype=np.int64)
+        self.start = np.zeros(self.cols * self.rows + 1, dtype=np.int64)
+
+    def _cells(self, x, y):
+        inv = 1.0 / self.cell_size
+        cx = np.clip((x * inv).astype(np.int64), 0, self.cols - 1)
+        cy = np.clip((y * inv).astype(np.int64), 0, self.rows - 1)
+        return cx, cy
+
+    def build(self, x, y):
+        """按粒子坐标重建网格：order 为按格子排序的粒子序号，start 为每个格子的起始位置"""
+        cx, cy = self._cells(x, y)
+        cell = cy * self.cols + cx
+        self.order = np.argsort(cell, kind="stable")
+        counts = np.bincount(cell, minlength=self.cols * self.rows)
+        self.start[0] = 0
+        np.cumsum(counts, out=self.start[1:])
+
+    def query(self, px, py, reach=1):
+        """返回候选对 (交互点序号, 粒子序号)：粒子位于交互点周围 reach 圈格子内"""
+        cx, cy = self._cells(px, py)
+        offsets = np.arange(-reach, reach + 1)
+        ox, oy = (a.ravel() for a in np.meshgrid(offsets, offsets))
+        ncx = cx[:, None] + ox
+        ncy = cy[:, None] + oy
+        inside = (ncx >= 0) & (ncx < self.cols) & (ncy >= 0) & (ncy < self.rows)
+        owner = np.broadcast_to(np.arange(len(px))[:, None], ncx.shape)[inside]
+        cell = (ncy * self.cols + ncx)[inside]
+
+        # 逐格子展开：每个格子贡献 [start, end) 区间内的全部粒子
+        first = self.start[cell]
+        counts = self.start[cell + 1] - first
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        base = np.repeat(first - (np.cumsum(counts) - counts), counts)
+        return np.repeat(owner, counts), self.order[base + np.arange(total)]
+
+
+# --- 2. 交互力场（鼠标、观众跟踪点）---
+class InteractionField:
+    """交互点对附近粒子的排斥（strength > 0）或吸引（strength < 0）
+
+    每个交互点在 radius 范围内按 (1 - d / radius)² 衰减，把粒子沿径向推开
+    strength 像素，同时按受到的影响提高不透明度（人群越密集越亮）。
+    交互点由主线程每帧整体替换（set_points），工作线程只读，可在流水线模式下使用。
+    """
+
+    def __init__(self, width, height, radius=120.0, strength=40.0, glow=80):
+        self.unit = height / REFERENCE_HEIGHT
+        self.radius = radius * self.unit
+        self.strength = strength * self.unit
+        self.glow = glow
+        # 格子边长取半径的一半、查询周围 5×5 格：候选面积 6.25 r²，比 3×3 格的 9 r² 少约三成
+        self.grid = SpatialHash(self.radius / 2, width, height)
+        self._points = (np.zeros(0, dtype=np.float32),) * 3
+
+    def __len__(self):
+        return len(self._points[0])
+
+    def set_points(self, x, y, strength=1.0):
+        """设置本帧的交互点（画面像素坐标）；strength 为每个点的强度系数，负数为吸引"""
+        x = np.atleast_1d(np.asarray(x, dtype=np.float32))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float32))
+        strength = np.broadcast_to(np.asarray(strength, dtype=np.float32), x.shape)
+        self._points = (x, y, strength)
+
+    def clear(self):
+        self.set_points([], [])
+
+    def apply(self, buffer):
+        """对粒子缓冲中的全部粒子施加交互力（原地修改坐标与不透明度）"""
+        px, py, strength = self._points
+        n = len(buffer)
+        if len(px) == 0 or n == 0:
+            return
+        x, y, _, _, alpha = buffer.columns()
+        self.grid.build(x, y)
+        owner, index = self.grid.query(px, py, reach=2)
+
+        dx = x[index] - px[owner]
+        dy = y[index] - py[owner]
+        distance = np.sqrt(dx * dx + dy * dy)
+        # 半径外的候选对衰减为 0（比先筛选再计算更省：少一轮整列复制）
+        falloff = np.maximum(1 - distance * np.float32(1 / self.radius), 0)
+        falloff *= falloff
+        push = falloff * strength[owner]
+        push *= np.float32(self.strength)
+        push /= np.maximum(distance, np.float32(1e-3))
+
+        # 同一粒子受多个交互点影响时位移叠加
+        x += np.bincount(index, weights=dx * push, minlength=n).astype(np.float32)
+        y += np.bincount(index, weights=dy * push, minlength=n).astype(np.float32)
+        influence = np.minimum(np.bincount(index, weights=falloff, minlength=n), 1)
+        alpha[:] = np.minimum(alpha + influence * self.glow, 255)
@@ -1,18 +1,40 @@
 import pygame
-import random
+import argparse
 import math
+import sys
 import time
+import numpy as np
 
-# --- 1. 初始化与参数配置 ---
-pygame.init()
+from asset_cache import ASSET_CACHE
+import drone  # 导入即注册 3D 无人机编队场景（--scenes 中的 drone）
+from bloom import GLOW_MODES, BloomPass, disc_energy
+from fractal_skeleton import FractalSkeleton
+from interaction import InteractionField
+from lut import LEVELS, gradient, level_of, wave_level
+from particle_buffer import ParticleBuffer
+from pipeline import SimulationPipeline
+from profiler import NULL_PROFILER, FrameProfiler, ProfilerOverlay
+from projectors import ProjectorLayout, TiledOutput, parse_grid
+from quality import QUALITY_LEVELS, QUALITY_NAMES, QualityGovernor
+from recorder import RECORD_FORMATS, FrameRecorder
+from render_target import Display, ScaledRenderTarget, parse_size
+from scene import SCENES, Scene, ScenePrewarmer, register_scene
+from sensors import SensorIngest, parse_address
+from sprite_cache import GlowSpriteCache, SpriteBatch
+from timeline import load_timeline
+from trail import TrailBuffer
 
-# 屏幕与性能设置
+# --- 1. 初始化与参数配置 ---
+# 默认窗口尺寸；窗口在 main() 中才打开（见 render_target.Display），导入本模块不会初始化显示
 WIDTH, HEIGHT = 1280, 720
-SCREEN = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("合肥骆岗公园沉浸式建筑光影装置 - 三幕投影")
-CLOCK = pygame.time.Clock()
+CAPTION = "合肥骆岗公园沉浸式建筑光影装置 - 三幕投影"
 
 # --- 2. 颜色配置 ---
+# 第一幕：远航（冷蓝矢量线，探索轨迹与多维空间）
+COLOR_ICE_BLUE = (120, 180, 255)  # 冰蓝色轨迹
+COLOR_VECTOR_CYAN = (90, 230, 255)  # 航线前端的青色亮点
+COLOR_BG_DEEP_BLUE = (5, 10, 25)  # 深海蓝背景
+
 # 第二幕：共生（绿色系，有机形态）
 COLOR_GREEN_DARK = (20, 80, 40)  # 深绿
 COLOR_GREEN_LIGHT = (50, 200, 100)  # 浅绿
@@ -29,275 +51,591 @@ COLOR_RADAR_BLUE = (0, 100, 200)  # 雷达蓝色（用于过渡）
 
 FADE_ALPHA = 20
 
-# 创建背景遮罩实现长曝光拖尾
-FADE_SURFACE = pygame.Surface((WIDTH, HEIGHT))
+# 颜色渐变与脉动查找表（按 0..255 级索引，见 lut.py）
+VOYAGE_GRADIENT = gradient(COLOR_VECTOR_CYAN, COLOR_ICE_BLUE)  # 航线：亮点 -> 尾部
+ORGANIC_GRADIENT = gradient(COLOR_RADAR_BLUE, COLOR_GREEN_LIGHT)  # 共生：工业蓝 -> 有机绿
+PULSE = np.linspace(0, 1, LEVELS, dtype=np.float32)  # 脉动级数 -> 0..1
+WINDOW_RGB = np.array([COLOR_WARM_GOLD, COLOR_COOL_CYAN], dtype=np.uint8)  # 偶数窗暖金，奇数窗冷青
+WINDOW_ALPHA = np.stack([80 + PULSE * 120, 100 + PULSE * 80]).astype(np.uint8)
+AMBIENT_ALPHA = (40 + PULSE * 60).astype(np.uint8)
+
+# 演出顺序（场景标识，见 scene.SCENES 注册表；数字键 1-9 按此顺序切换）
+SHOW = ["voyage", "symbiosis", "pulse"]
+SCENE_DURATION = 4.0
+PREWARM_LEAD = 1.0  # 场景结束前多少秒开始在后台准备下一个场景
+
+# 共享随机数发生器（生成器内的随机量全部来自这里）
+RNG = np.random.default_rng()
+
+# 发光贴图缓存（按量化的大小/颜色/透明度复用，避免每帧创建上千个 Surface）
+GLOW_CACHE = GlowSpriteCache(capacity=2048)
 
 
 # --- 3. 场景管理 ---
 class SceneManager:
-    def __init__(self):
+    """按演出顺序循环切换场景；entry 为进场序号（每次切换加 1，用于区分同一场景的不同进场）"""
+
+    def __init__(self, count=len(SHOW)):
+        self.count = count
         self.current_scene = 0
-        self.scene_duration = 4.0  # 每个场景4秒（总共12秒，三个场景）
-        self.scene_start_time = 0.0
+        self.scene_duration = SCENE_DURATION  # 每个场景4秒（总共12秒，三个场景）
+        self.scene_start_time = None
+        self.entry = 0
     
     def update(self, current_time):
-        if self.scene_start_time == 0.0:
+        if self.scene_start_time is None:
             self.scene_start_time = current_time
         
         scene_time = current_time - self.scene_start_time
         if scene_time >= self.scene_duration:
-            self.current_scene = (self.current_scene + 1) % 2
-            self.scene_start_time = current_time
+            self.select((self.current_scene + 1) % self.count, current_time)
             scene_time = 0.0
         return self.current_scene, scene_time
-
-
-# --- 4. 第二幕：共生（分形算法生成绿色脉络）---
-def generate_fractal_branches(particles, scene_time):
-    """使用分形算法生成向上攀爬的绿色脉络（完整连接的树形）"""
-    new_particles = []
-    
-    # 信标塔中心位置
-    tower_x = WIDTH / 2
-    tower_base_y = HEIGHT * 0.95
-    tower_height = HEIGHT * 0.85
-    
-    # 分形分支算法（优化版 - 限制递归和粒子数量）
-    def generate_branch(start_x, start_y, angle, length, depth, branch_angle, particles_list, max_particles=500):
-        if depth <= 0 or length < 5 or len(particles_list) >= max_particles:
-            return
-        
-        # 当前分支
-        end_x = start_x + math.cos(angle) * length
-        end_y = start_y + math.sin(angle) * length
-        
-        # 绘制分支线条（稀疏一些以防爆炸）
-        steps = max(2, int(length / 5))
-        for i in range(steps):
-            if len(particles_list) >= max_particles:
-                break
-            t = i / max(1, steps - 1)
-            x = start_x + (end_x - start_x) * t
-            y = start_y + (end_y - start_y) * t
-            
-            # 颜色：绿色系，越高越亮
-            green_val = int(80 + depth * 30 + t * 60)
-            color = (20, min(255, green_val), min(255, green_val // 2 + 40))
-            
-            particles_list.append({
-                'x': x, 'y': y, 'size': 2 + depth * 0.3,
-                'color': color,
-                'alpha': 150 + depth * 20
-            })
-        
-        # 递归生成子分支（只生成2个而不是3个）
-        if depth > 1 and len(particles_list) < max_particles * 0.8:
-            new_length = length * 0.75  # 衰减系数调整为0.75（更缓和）
-            # 左分支（向外扩展）
-            left_angle = angle - branch_angle * 0.8
-            generate_branch(end_x, end_y, left_angle, new_length, depth - 1, branch_angle, particles_list, max_particles)
-            # 右分支（向外扩展）
-            right_angle = angle + branch_angle * 0.8
-            generate_branch(end_x, end_y, right_angle, new_length, depth - 1, branch_angle, particles_list, max_particles)
     
-    # 从底部中心生成主树干，然后分支
-    growth_progress = min(1.0, scene_time / 4.0)  # 4秒内完全生长
+    def select(self, scene_num, current_time):
+        """立即切换到指定场景（数字键）"""
+        self.current_scene = scene_num
+        self.scene_start_time = current_time
+        self.entry += 1
     
-    # 主树干（从底部中心向上）
-    trunk_height = tower_height * growth_progress * 0.35  # 树干长度缩短为35%
-    trunk_steps = int(trunk_height / 5)
-    for i in range(trunk_steps):
-        y = tower_base_y - i * 5
-        x = tower_x + math.sin(scene_time * 0.3 + i * 0.05) * 3  # 轻微摆动
-        color_intensity = int(60 + i / max(1, trunk_steps) * 100)
-        new_particles.append({
-            'x': x, 'y': y, 'size': 3.5 - i / max(1, trunk_steps) * 1.5,
-            'color': (20, min(255, color_intensity), min(255, color_intensity // 2 + 30)),
-            'alpha': 200
-        })
-    
-    # 从主树干顶部开始分支
-    trunk_top_y = tower_base_y - trunk_height
+    def upcoming(self):
+        """按顺序播放时下一个场景的 (场景编号, 进场序号)"""
+        return (self.current_scene + 1) % self.count, self.entry + 1
+
+
+def scene_at(t, duration=SCENE_DURATION, count=len(SHOW)):
+    """固定时间轴上的场景：返回 (场景编号, 场景内时间, 第几次进场)"""
+    entry = int(t // duration)
+    return entry % count, t - entry * duration, entry
+
+
+# --- 4. 第一幕：远航（冷蓝矢量线：探索轨迹与多维空间）---
+ROUTE_DTYPE = np.dtype([("y", "f4"), ("amp", "f4"), ("freq", "f4"), ("phase", "f4"),
+                        ("speed", "f4"), ("offset", "f4")])
+STAR_DTYPE = np.dtype([("x", "f4"), ("y", "f4"), ("phase", "f4")])
+
+
+def make_voyage_routes(rng, count=24):
+    """随机生成航线参数（坐标均为画面宽高的比例）"""
+    routes = np.empty(count, dtype=ROUTE_DTYPE)
+    routes["y"] = 0.2 + rng.random(count) * 0.6
+    routes["amp"] = 0.03 + rng.random(count) * 0.12
+    routes["freq"] = 0.5 + rng.random(count)
+    routes["phase"] = rng.random(count)
+    routes["speed"] = 0.12 + rng.random(count) * 0.2  # 每秒前进的画面宽度比例
+    routes["offset"] = rng.random(count) * 1.2
+    return routes
+
+
+def make_star_field(rng, count=150):
+    stars = np.empty(count, dtype=STAR_DTYPE)
+    stars["x"] = rng.random(count)
+    stars["y"] = rng.random(count)
+    stars["phase"] = rng.random(count) * math.pi * 2
+    return stars
+
+
+def generate_voyage_routes(buffer, scene_time, routes, width=WIDTH, height=HEIGHT, trail=48):
+    """生成航线：每条航线的亮点沿正弦轨迹前进，身后拖出渐隐的矢量线，写入粒子缓冲"""
+    # 亮点位置在 -0.1..1.1 之间循环，航线完整地进出画面
+    head = (routes["offset"] + scene_time * routes["speed"]) % 1.2 - 0.1
+    k = np.arange(trail) / trail  # 0 为亮点，越往后越暗
+    u = head[:, None] - k * 0.2
+    phase = 2 * math.pi * (routes["freq"][:, None] * u + routes["phase"][:, None])
+    x = u * width
+    y = (routes["y"][:, None] + routes["amp"][:, None] * np.sin(phase)) * height
     
-    # 生成较少的主分支（3个而不是6个，防止爆炸）
-    num_main_branches = 6
-    for i in range(num_main_branches):
-        if len(new_particles) > 1500:  # 限制总粒子数
-            break
-        branch_angle_offset = (i / num_main_branches) * math.pi * 2
-        # 让分支更均匀分散（像树冠一样）
-        base_angle = -math.pi / 2 + math.cos(branch_angle_offset) * 0.6
-        
-        branch_length = trunk_height * (0.4 + random.random() * 0.2) * growth_progress
-        
-        generate_branch(
-            tower_x,
-            trunk_top_y,
-            base_angle,
-            branch_length,
-            3,  # 减少分形深度到3
-            math.pi / 7,  # 分支角度
-            new_particles,
-            max_particles=600
-        )
+    # 颜色从亮点的青色渐变为尾部的冰蓝色
+    fade = 1 - k
+    size = 1.0 + 2.5 * fade ** 2
+    rgb = VOYAGE_GRADIENT[level_of(k)]
+    alpha = (30 + 210 * fade).astype(np.int32)
     
-    return new_particles
+    shape = x.shape
+    buffer.append(x.ravel(), y.ravel(), np.broadcast_to(size, shape).ravel(),
+                  np.broadcast_to(rgb, (*shape, 3)).reshape(-1, 3), np.broadcast_to(alpha, shape).ravel())
 
 
-def generate_organic_particles(particles, scene_time):
-    """生成有机形态的粒子（从工业向有机转变）"""
-    new_particles = []
-    
+def generate_star_field(buffer, scene_time, stars, width=WIDTH, height=HEIGHT):
+    """多维空间的背景星点：位置固定，亮度缓慢闪烁"""
+    twinkle = 0.5 + 0.5 * np.sin(scene_time * 1.5 + stars["phase"])
+    buffer.append(stars["x"] * width, stars["y"] * height, 1.2, COLOR_ICE_BLUE,
+                  (20 + 60 * twinkle).astype(np.int32))
+
+
+# --- 5. 第二幕：共生（分形算法生成绿色脉络）---
+def generate_fractal_branches(buffer, scene_time, skeleton, budget=None):
+    """使用分形算法生成向上攀爬的绿色脉络（完整连接的树形），写入粒子缓冲
+
+    树形骨架在进入场景时由 FractalSkeleton 一次性生成，这里只按
+    scene_time 展开已经长出的部分，因此树冠不再逐帧闪烁。
+    """
+    skeleton.emit(buffer, scene_time, budget)
+
+
+def generate_organic_particles(buffer, scene_time, rng=RNG, count=150, width=WIDTH, height=HEIGHT):
+    """生成有机形态的粒子（从工业向有机转变），写入粒子缓冲"""
     # 过渡效果：从蓝色向绿色转变
     transition = min(1.0, scene_time / 4.0)  # 4秒过渡
     
     # 生成流动的有机粒子
-    for i in range(150):
-        x = WIDTH / 2 + (random.random() - 0.5) * WIDTH * 0.8
-        y = HEIGHT * 0.2 + random.random() * HEIGHT * 0.6
-        
-        # 流动效果
-        wave_x = math.sin(scene_time * 2 + x * 0.01) * 20
-        wave_y = math.cos(scene_time * 1.5 + y * 0.01) * 15
-        x += wave_x
-        y += wave_y
-        
-        # 颜色过渡
-        r = int(COLOR_RADAR_BLUE[0] * (1 - transition) + COLOR_GREEN_LIGHT[0] * transition)
-        g = int(COLOR_RADAR_BLUE[1] * (1 - transition) + COLOR_GREEN_LIGHT[1] * transition)
-        b = int(COLOR_RADAR_BLUE[2] * (1 - transition) + COLOR_GREEN_LIGHT[2] * transition)
-        
-        new_particles.append({
-            'x': x, 'y': y, 'size': 2 + random.random() * 3,
-            'color': (r, g, b),
-            'alpha': int(100 + 100 * transition)
-        })
+    x = width / 2 + (rng.random(count) - 0.5) * width * 0.8
+    y = height * 0.2 + rng.random(count) * height * 0.6
+    
+    # 流动效果（波长与幅度以 720p 为基准，随分辨率等比缩放）
+    unit = height / HEIGHT
+    wave_x = np.sin(scene_time * 2 + x * (0.01 / unit)) * (20 * unit)
+    wave_y = np.cos(scene_time * 1.5 + y * (0.01 / unit)) * (15 * unit)
+    
+    # 颜色过渡
+    rgb = ORGANIC_GRADIENT[level_of(transition)]
     
-    return new_particles
+    buffer.append(x + wave_x, y + wave_y, 2 + rng.random(count) * 3,
+                  rgb, int(100 + 100 * transition))
 
 
-# --- 5. 第三幕：脉动（建筑光斑，不同大小的发光泡泡）---
-def generate_building_lights(particles, scene_time):
-    """生成建筑光斑效果：多个不同大小的发光泡泡，呈现微妙的脉动"""
-    new_particles = []
-    
+# --- 6. 第三幕：脉动（建筑光斑，不同大小的发光泡泡）---
+def generate_building_lights(buffer, scene_time, rng=RNG, ambient=20, width=WIDTH, height=HEIGHT):
+    """生成建筑光斑效果：多个不同大小的发光泡泡，呈现微妙的脉动，写入粒子缓冲"""
     # 建筑窗口网格（固定位置）
     grid_cols = 8
     grid_rows = 5
-    window_spacing_x = WIDTH / (grid_cols + 1)
-    window_spacing_y = HEIGHT / (grid_rows + 1)
+    window_spacing_x = width / (grid_cols + 1)
+    window_spacing_y = height / (grid_rows + 1)
     
     # 生成网格状窗户光斑
-    for row in range(grid_rows):
-        for col in range(grid_cols):
-            x = (col + 1) * window_spacing_x
-            y = (row + 1) * window_spacing_y
-            
-            # 每个窗户有随机的脉动周期
-            window_id = row * grid_cols + col
-            pulse_offset = window_id * 0.3
-            pulse = 0.5 + 0.5 * math.sin(scene_time * 2 + pulse_offset)
-            
-            # 大小随机（不同的窗户大小）
-            base_size = 8 + (window_id % 5) * 3
-            size = base_size * (0.7 + 0.3 * pulse)
-            
-            # 颜色：暖金色和冷青色交替
-            if window_id % 2 == 0:
-                color = COLOR_WARM_GOLD
-                alpha = int(80 + pulse * 120)
-            else:
-                color = COLOR_COOL_CYAN
-                alpha = int(100 + pulse * 80)
-            
-            new_particles.append({
-                'x': x, 'y': y, 'size': size,
-                'color': color,
-                'alpha': alpha
-            })
+    window_id = np.arange(grid_rows * grid_cols)
+    row, col = np.divmod(window_id, grid_cols)
+    x = (col + 1) * window_spacing_x
+    y = (row + 1) * window_spacing_y
+    
+    # 每个窗户有随机的脉动周期（量化为查找表级数）
+    level = wave_level(scene_time * 2 + window_id * 0.3)
+    pulse = PULSE[level]
+    
+    # 大小随机（不同的窗户大小）
+    base_size = 8 + (window_id % 5) * 3
+    size = base_size * (0.7 + 0.3 * pulse)
+    
+    # 颜色：暖金色和冷青色交替
+    parity = window_id % 2
+    rgb = WINDOW_RGB[parity]
+    alpha = WINDOW_ALPHA[parity, level]
+    
+    buffer.append(x, y, size, rgb, alpha)
     
     # 额外的散散光斑（楼外的微妙光源）
-    for i in range(20):
-        x = random.random() * WIDTH
-        y = random.random() * HEIGHT
+    i = np.arange(ambient)
+    x = rng.random(ambient) * width
+    y = rng.random(ambient) * height
+    
+    # 这些光斑更大、更柔和
+    size = 15 + rng.random(ambient) * 20
+    level = wave_level(scene_time * 1.2 + i * 0.4)
+    
+    # 混合颜色
+    color_mix = WINDOW_RGB[rng.integers(0, 2, ambient)]
+    
+    buffer.append(x, y, size * PULSE[level], color_mix, AMBIENT_ALPHA[level])
+
+
+# --- 7. 场景插件 ---
+class ParticleScene(Scene):
+    """以粒子缓冲为中间结果的场景：update 向后台缓冲写入粒子，render 整批绘制前台缓冲
+
+    count 为场景可调的粒子数量（基准测试会修改），实际数量再乘以画质等级的比例。
+    interactive 的场景每帧生成粒子后再叠加交互点（鼠标、观众）的排斥力。
+    """
+
+    fade_alpha = FADE_ALPHA
+    double_buffered = True
+    interactive = False
+
+    def __init__(self, width, height, count):
+        super().__init__(width, height)
+        self.count = count
+        self.particles = ParticleBuffer()  # 前台：正在绘制的一帧
+        self.back = ParticleBuffer()  # 后台：正在计算的下一帧
+        self.batch = SpriteBatch(GLOW_CACHE)
+
+    def update(self, scene_time, rng):
+        self.back.clear()
+        self.emit(self.back, scene_time, rng, self.quality.particles)
+
+    def swap(self):
+        self.particles, self.back = self.back, self.particles
+
+    def emit(self, buffer, scene_time, rng, share):
+        """子类实现：向已清空的 buffer 追加本帧的粒子
+
+        每个粒子为屏幕坐标、720p 基准下的半径、RGB 与 alpha（见 ParticleBuffer.append）；
+        share 为画质等级保留的粒子比例（0..1），子类据此缩减本帧生成的粒子数量。
+        """
+        pass
+
+    def render(self, surface, bloom=None):
+        # 屏幕外的粒子一次掩码剔除，贴图取自缓存，整帧一次批量叠加
+        x, y, size, rgb, alpha = self.particles.visible(self.width, self.height)
+        radius = size * (self.unit * self.quality.glow_radius)
+        if bloom is not None:
+            # 内核保留 1/4 的面积，其余 3/4 的能量泼溅到模糊缓冲
+            bloom.splat(x, y, rgb, disc_energy(radius, alpha) * 0.75)
+            radius *= 0.5
+        self.batch.add_arrays(x, y, radius, rgb, alpha)
+        self.batch.flush(surface, pygame.BLEND_ADD)
+        return len(x)
+
+
+@register_scene
+class VoyageScene(ParticleScene):
+    id = "voyage"
+    name = "第一幕：远航"
+    background = COLOR_BG_DEEP_BLUE
+
+    def __init__(self, width, height, count=24):
+        super().__init__(width, height, count)
+        self.routes = self.stars = None
+
+    def setup(self, rng):
+        self.routes = make_voyage_routes(rng, self.count)
+        self.stars = make_star_field(rng)
+
+    def emit(self, buffer, scene_time, rng, share):
+        routes = self.routes[:max(1, int(len(self.routes) * share))]
+        generate_star_field(buffer, scene_time, self.stars, self.width, self.height)
+        generate_voyage_routes(buffer, scene_time, routes, self.width, self.height)
+
+
+@register_scene
+class SymbiosisScene(ParticleScene):
+    id = "symbiosis"
+    name = "第二幕：共生"
+    background = COLOR_BG_NIGHT
+
+    def __init__(self, width, height, count=150):
+        super().__init__(width, height, count)
+        self.skeleton = None
+
+    def setup(self, rng):
+        # 每次进入场景只生成一次分形骨架
+        self.skeleton = FractalSkeleton(self.width, self.height, rng=rng)
+
+    def emit(self, buffer, scene_time, rng, share):
+        budget = int(len(self.skeleton) * share) if share < 1 else None
+        generate_fractal_branches(buffer, scene_time, self.skeleton, budget)
+        generate_organic_particles(buffer, scene_time, rng, int(self.count * share),
+                                   width=self.width, height=self.height)
+
+
+@register_scene
+class PulseScene(ParticleScene):
+    id = "pulse"
+    name = "第三幕：脉动 (建筑光斑)"
+    background = COLOR_BG_DARK_WARM
+    interactive = True  # 鼠标 / 观众位置推开附近的光斑，人群越密集越亮
+
+    def __init__(self, width, height, count=20):
+        super().__init__(width, height, count)
+
+    def emit(self, buffer, scene_time, rng, share):
+        generate_building_lights(buffer, scene_time, rng, int(self.count * share),
+                                 width=self.width, height=self.height)
+
+
+# --- 8. 帧渲染（实时窗口与离线渲染共用）---
+class FrameRenderer:
+    """按演出顺序把场景绘制到任意尺寸的目标表面上
+
+    每次进场创建新的场景实例并 setup；prewarm() 在后台线程提前准备下一个场景，
+    切换时直接取用。长曝光拖尾依赖上一帧的画面，因此同一个渲染器需按时间顺序连续绘制。
+    离线渲染时通过 render_at() 使用固定时间轴和按帧/按进场播种的随机数，
+    使任意一帧的内容只取决于 (seed, 帧号)。
+    pipeline=True 时下一帧的场景状态在工作线程上计算，与本帧的绘制重叠（见 pipeline.py）。
+    """
+
+    def __init__(self, surface, seed=None, profiler=NULL_PROFILER, glow="sprites", show=SHOW, options=None,
+                 pipeline=False):
+        self.surface = surface
+        self.profiler = profiler
+        self.width, self.height = surface.get_size()
+        self.unit = self.height / HEIGHT  # 粒子大小按 720p 基准缩放
+        self.seed = seed
+        self.show = list(show)
+        self.options = options or {}  # 场景标识 -> 构造参数，如 {"symbiosis": {"count": 1500}}
+        first = SCENES[self.show[0]]
+        self.trail = TrailBuffer(surface, first.background, first.fade_alpha)
+        self.quality = QUALITY_LEVELS[0]
+        self.timeline = None  # 烘焙的时间轴（timeline.Timeline），为 None 时实时计算
+        self.scene = None
+        self.scene_key = None
+        self.prewarmer = ScenePrewarmer()
+        self.pipeline = SimulationPipeline() if pipeline else None
+        self.interaction = InteractionField(self.width, self.height)  # 交互点由主循环每帧设置
         
-        # 这些光斑更大、更柔和
-        size = 15 + random.random() * 20
-        pulse = 0.5 + 0.5 * math.sin(scene_time * 1.2 + i * 0.4)
+        # bloom 模式下光斑只画缩小的内核，柔光由整帧一次的降分辨率模糊补足
+        self.bloom = None
+        if glow == "bloom":
+            # 骨架光点密集重叠，泼溅能量不再被 255 截断，因此减半以保持整体亮度
+            self.bloom = BloomPass((self.width, self.height), radius=12 * self.unit, intensity=0.5)
+
+    def create_scene(self, scene_num, setup_rng=None):
+        """构造并 setup 一个场景实例（预热时在后台线程中执行）"""
+        scene_id = self.show[scene_num]
+        scene = SCENES[scene_id](self.width, self.height, **self.options.get(scene_id, {}))
+        scene.setup(setup_rng if setup_rng is not None else np.random.default_rng())
+        return scene
+
+    def prewarm(self, scene_num, entry_key, setup_rng=None):
+        """在后台准备第 entry_key 次进场的场景"""
+        self.prewarmer.prewarm((scene_num, entry_key), lambda: self.create_scene(scene_num, setup_rng))
+
+    def enter(self, scene_num, entry_key, setup_rng=None):
+        """切换到新场景（优先取用预热好的实例），返回当前场景"""
+        key = (scene_num, entry_key)
+        if key != self.scene_key:
+            if self.pipeline is not None:
+                self.pipeline.wait()
+            if self.scene is not None:
+                self.scene.teardown()
+            self.scene = self.prewarmer.take(key, lambda: self.create_scene(scene_num, setup_rng))
+            self.scene_key = key
+        return self.scene
+
+    def update(self, scene, scene_num, scene_time, rng=RNG):
+        """计算一帧场景状态（写入后台缓冲）；播放烘焙时间轴时粒子场景直接读取预先计算的粒子帧"""
+        scene.quality = self.quality
+        if self.timeline is not None and isinstance(scene, ParticleScene):
+            self.timeline.emit(scene.back, scene_num, scene_time, self.width, self.height,
+                               self.quality.particles)
+        else:
+            scene.update(scene_time, rng)
+        if isinstance(scene, ParticleScene) and scene.interactive:
+            self.interaction.apply(scene.back)
+
+    def generate(self, scene_num, scene_time, entry_key, rng=RNG, setup_rng=None):
+        """只计算一帧（不绘制），返回场景实例"""
+        scene = self.enter(scene_num, entry_key, setup_rng)
+        self.update(scene, scene_num, scene_time, rng)
+        scene.swap()
+        return scene
+
+    def draw(self, scene_num, scene_time, entry_key, rng=RNG, setup_rng=None, ahead=None):
+        """绘制一帧；(scene_num, entry_key) 变化表示进入新场景
+
+        ahead 为同一场景下一帧的 (场景内时间, 随机数发生器)。流水线模式下
+        下一帧随即提交到工作线程，与本帧的拖尾、绘制和画面提交并行计算；
+        下次调用时直接取用（此时 generate 阶段只剩等待工作线程的时间）。
+        """
+        profiler = self.profiler
+        pipeline = self.pipeline
+        with profiler.stage("generate"):
+            scene = self.enter(scene_num, entry_key, setup_rng)
+            if pipeline is None or not pipeline.collect(scene):
+                self.update(scene, scene_num, scene_time, rng)
+                scene.swap()
+            if pipeline is not None and ahead is not None and scene.double_buffered:
+                pipeline.submit(scene, self.update, scene, scene_num, *ahead)
         
-        # 混合颜色
-        color_mix = random.choice([COLOR_WARM_GOLD, COLOR_COOL_CYAN])
+        # 拖尾衰减到当前场景的背景色（切换场景时自动过渡）
+        with profiler.stage("fade"):
+            self.trail.set_scene(scene.background, scene.fade_alpha)
+            self.trail.fade()
         
-        new_particles.append({
-            'x': x, 'y': y, 'size': size * pulse,
-            'color': color_mix,
-            'alpha': int(40 + pulse * 60)
-        })
-    
-    return new_particles
+        with profiler.stage("draw"):
+            bloom = self.bloom if self.quality.glow else None
+            count = scene.render(self.surface, bloom)
+        if bloom is not None:
+            with profiler.stage("bloom"):
+                bloom.apply(self.surface)
+        return count
 
+    def render_at(self, t, frame, dt=None):
+        """按固定时间轴绘制第 frame 帧（t 为该帧的绝对时间，dt 为帧间隔，流水线模式用）"""
+        seed = self.seed or 0
+        scene_num, scene_time, entry = scene_at(t, count=len(self.show))
+        if scene_time >= SCENE_DURATION - PREWARM_LEAD:
+            self.prewarm((entry + 1) % len(self.show), entry + 1, np.random.default_rng([seed, entry + 1, 1]))
+        ahead = None
+        if dt is not None:
+            _, next_time, next_entry = scene_at(t + dt, count=len(self.show))
+            if next_entry == entry:
+                ahead = (next_time, np.random.default_rng([seed, frame + 1]))
+        rng = np.random.default_rng([seed, frame])
+        setup_rng = np.random.default_rng([seed, entry, 1])
+        return self.draw(scene_num, scene_time, entry, rng, setup_rng, ahead)
 
-# --- 6. 主循环 ---
-def main():
-    scene_manager = SceneManager()
+    def close(self):
+        if self.pipeline is not None:
+            self.pipeline.shutdown()
+        self.prewarmer.shutdown()
+
+
+# --- 9. 主循环 ---
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="合肥骆岗公园沉浸式建筑光影装置 - 三幕投影")
+    parser.add_argument("--profile", action="store_true", help="显示分阶段性能叠加层（F3 切换）")
+    parser.add_argument("--trace", metavar="PATH", help="退出时导出逐帧性能追踪（.json 或 .csv）")
+    parser.add_argument("--quality", choices=["auto", *QUALITY_NAMES], default="auto",
+                        help="画质等级：auto 为按帧耗时自动调节，其余为固定等级（录制时使用）")
+    parser.add_argument("--size", type=parse_size, help=f"输出分辨率，如 3840x2160（默认 {WIDTH}x{HEIGHT}）")
+    parser.add_argument("--fullscreen", action="store_true", help="全屏输出（未指定 --size 时使用桌面分辨率）")
+    parser.add_argument("--render-scale", type=float, default=1.0,
+                        help="内部渲染分辨率占输出分辨率的比例，如 0.5（4K 投影时减轻填充开销）")
+    parser.add_argument("--upscale", choices=["fast", "smooth"], default="fast",
+                        help="放大方式：fast 最近邻（默认），smooth 双线性（更柔和，4K 下耗时明显更高）")
+    parser.add_argument("--glow", choices=GLOW_MODES, default="sprites",
+                        help="柔光：sprites 逐粒子贴图；bloom 整帧降分辨率模糊（开销与粒子数无关）")
+    parser.add_argument("--scenes", default=",".join(SHOW),
+                        help=f"逗号分隔的演出顺序，可选：{', '.join(SCENES)}（数字键 1-9 按此顺序切换）")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="流水线模式：工作线程计算下一帧粒子的同时主线程绘制并提交本帧")
+    parser.add_argument("--sensors", metavar="[HOST:]PORT", type=parse_address,
+                        help="在本地 UDP 端口接收观众位置（见 sensors.py，可用 sensors.py simulate 模拟）")
+    parser.add_argument("--timeline", metavar="PATH",
+                        help="播放 timeline.py 烘焙的时间轴文件，不再逐帧实时计算粒子")
+    parser.add_argument("--projectors", metavar="COLSxROWS", type=parse_grid,
+                        help="多投影机拼接，如 3x1；此时 --size 为单台投影机的分辨率（见 projectors.py）")
+    parser.add_argument("--overlap", type=int, default=0, help="相邻投影机画面的重叠宽度（像素），在重叠带内边缘融合")
+    parser.add_argument("--blend-gamma", type=float, default=2.2, help="投影机的 gamma，用于融合带的亮度补偿")
+    parser.add_argument("--record", metavar="PATH",
+                        help="录制演出：.mp4/.mkv/.mov/.avi 交给 ffmpeg 编码，其他路径为图像序列目录（见 recorder.py）")
+    parser.add_argument("--record-format", choices=RECORD_FORMATS, help="录制格式（默认按路径扩展名选择 video 或 raw）")
+    parser.add_argument("--record-fps", type=float, default=30, help="录制帧率")
+    parser.add_argument("--record-buffers", type=int, default=8,
+                        help="录制缓冲帧数；写出跟不上时丢弃新帧并计数，演出本身不会变慢")
+    parser.add_argument("--no-asset-cache", action="store_true",
+                        help="不读写派生资源的磁盘缓存（点云采样、编队变换规划，见 asset_cache.py）")
+    args = parser.parse_args(argv)
+    args.scenes = args.scenes.split(",")
+    unknown = [name for name in args.scenes if name not in SCENES]
+    if unknown:
+        parser.error(f"未知场景：{', '.join(unknown)}（可选：{', '.join(SCENES)}）")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    profiler = FrameProfiler() if (args.profile or args.trace) else NULL_PROFILER
+    
+    pinned = None if args.quality == "auto" else QUALITY_NAMES.index(args.quality)
+    governor = QualityGovernor(target_fps=60, pinned=pinned)
+    
+    if args.no_asset_cache:
+        ASSET_CACHE.enabled = False
+    if args.projectors:
+        # 多投影机：窗口为各投影机画面并排的拼接桌面，场景绘制到重叠拼接后的虚拟画布
+        layout = ProjectorLayout(*args.projectors, args.size or (WIDTH, HEIGHT), args.overlap, args.blend_gamma)
+        display = Display(layout.output_size, args.fullscreen, CAPTION)
+        target = TiledOutput(layout, display.screen, args.render_scale, smooth=args.upscale == "smooth")
+    else:
+        display = Display(args.size or (None if args.fullscreen else (WIDTH, HEIGHT)), args.fullscreen, CAPTION)
+        target = ScaledRenderTarget(display.screen, args.render_scale, smooth=args.upscale == "smooth")
+    screen = display.screen
+    overlay = ProfilerOverlay(profiler) if args.profile else None  # 字体需在窗口打开（pygame.init）之后创建
+    
+    show = args.scenes
+    scene_manager = SceneManager(len(show))
+    renderer = FrameRenderer(target.surface, profiler=profiler, glow=args.glow, show=show, pipeline=args.pipeline)
+    if args.timeline:
+        try:
+            renderer.timeline = load_timeline(args.timeline, show)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    ingest = SensorIngest(*args.sensors).start() if args.sensors else None
+    recorder = FrameRecorder(args.record, args.record_fps, args.record_format,
+                             args.record_buffers).start(screen) if args.record else None
     running = True
-    start_time = time.time()
+    paused = False
+    last_time = time.time()
+    current_time = 0.0
+    frame_dt = 1 / 60  # 上一帧的间隔，用来预估下一帧的时间（流水线模式）
+    scene_num, scene_time = 0, 0.0
     
     while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    running = False
-                elif event.key == pygame.K_SPACE:
-                    # 空格键切换场景（用于测试）
-                    scene_manager.current_scene = (scene_manager.current_scene + 1) % 2
-                    scene_manager.scene_start_time = current_time
+        frame_start = time.perf_counter()
+        renderer.quality = governor.level
+        profiler.annotate(quality=governor.level.name)
         
-        current_time = time.time() - start_time
-        scene_num, scene_time = scene_manager.update(current_time)
+        with profiler.stage("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        running = False
+                    elif event.key == pygame.K_SPACE:
+                        # 空格键暂停/继续（冻结当前画面）
+                        paused = not paused
+                    elif pygame.K_1 <= event.key <= pygame.K_9 and event.key - pygame.K_1 < len(show):
+                        # 数字键直接切换到演出顺序中的第 N 个场景
+                        scene_manager.select(event.key - pygame.K_1, current_time)
+                    elif event.key == pygame.K_F3 and overlay is not None:
+                        overlay.toggle()
         
-        # 根据当前场景设置背景
-        if scene_num == 0:
-            FADE_SURFACE.fill(COLOR_BG_NIGHT)
-            scene_name = "第一幕：共生"
+        # 交互点：鼠标位置与传感器跟踪到的观众（“脉动”中模拟人群干扰光斑）
+        xs, ys, strengths = [], [], []
+        if pygame.mouse.get_focused():
+            mouse_x, mouse_y = target.map_point(pygame.mouse.get_pos())
+            xs.append([mouse_x])
+            ys.append([mouse_y])
+            strengths.append([1.0])
+        if ingest is not None:
+            crowd = ingest.latest()
+            if crowd is not None:
+                width, height = target.size
+                xs.append(crowd.x * width)
+                ys.append(crowd.y * height)
+                strengths.append(crowd.density)  # 密度越高推力越强
+            profiler.annotate(**{f"sensor_{name}": value for name, value in ingest.counters().items()})
+        if xs:
+            renderer.interaction.set_points(np.concatenate(xs), np.concatenate(ys), np.concatenate(strengths))
         else:
-            FADE_SURFACE.fill(COLOR_BG_DARK_WARM)
-            scene_name = "第二幕：脉动 (建筑光斑)"
-        
-        FADE_SURFACE.set_alpha(FADE_ALPHA)
-        SCREEN.blit(FADE_SURFACE, (0, 0))
-        
-        # 渲染当前场景
-        all_particles = []
+            renderer.interaction.clear()
         
-        if scene_num == 0:  # 第一幕：共生
-            all_particles.extend(generate_fractal_branches([], scene_time))
-            all_particles.extend(generate_organic_particles([], scene_time))
-        else:  # 第二幕：脉动
-            all_particles.extend(generate_building_lights([], scene_time))
+        # 暂停期间时间轴停止前进，画面保持最后一帧
+        now = time.time()
+        if not paused:
+            frame_dt = now - last_time
+            current_time += frame_dt
+            scene_num, scene_time = scene_manager.update(current_time)
+            if scene_time >= scene_manager.scene_duration - PREWARM_LEAD:
+                renderer.prewarm(*scene_manager.upcoming())
+            next_time = scene_time + frame_dt
+            ahead = (next_time, RNG) if next_time < scene_manager.scene_duration else None
+            renderer.draw(scene_num, scene_time, scene_manager.entry, ahead=ahead)
+        last_time = now
+        with profiler.stage("upscale"):
+            target.present()
+        if recorder is not None:
+            with profiler.stage("record"):
+                recorder.capture(screen, current_time)
+            profiler.annotate(**{f"record_{name}": value for name, value in recorder.counters().items()})
         
-        # 绘制所有粒子
-        for p in all_particles:
-            if 0 <= p['x'] < WIDTH and 0 <= p['y'] < HEIGHT:
-                # 创建半透明表面
-                particle_surface = pygame.Surface((int(p['size'] * 3), int(p['size'] * 3)), pygame.SRCALPHA)
-                color_with_alpha = (*p['color'], p.get('alpha', 255))
-                pygame.draw.circle(particle_surface, color_with_alpha,
-                                 (int(p['size'] * 1.5), int(p['size'] * 1.5)),
-                                 int(p['size']))
-                SCREEN.blit(particle_surface,
-                           (int(p['x'] - p['size'] * 1.5), int(p['y'] - p['size'] * 1.5)),
-                           special_flags=pygame.BLEND_ADD)
+        if overlay is not None:
+            with profiler.stage("hud"):
+                overlay.draw(screen, show[scene_num])
         
         # 显示场景信息
-        pygame.display.set_caption(f"{scene_name} | 场景 {scene_num + 1}/2 | 时间: {int(scene_time)}s | 按ESC退出")
+        scene_name = SCENES[show[scene_num]].name + (" (暂停)" if paused else "")
+        pygame.display.set_caption(f"{scene_name} | 场景 {scene_num + 1}/{len(show)} | "
+                                   f"时间: {int(scene_time)}s | 按ESC退出")
         
-        pygame.display.flip()
-        CLOCK.tick(60)
+        with profiler.stage("flip"):
+            pygame.display.flip()
+        governor.update(time.perf_counter() - frame_start)
+        with profiler.stage("tick"):
+            display.tick(60)
+        profiler.end_frame(show[scene_num])
     
-    pygame.quit()
+    renderer.close()
+    if recorder is not None:
+        recorder.close()
+        print("录制：" + "  ".join(f"{k} {v}" for k, v in recorder.counters().items()), file=sys.stderr)
+    if ingest is not None:
+        ingest.stop()
+    if args.trace:
+        profiler.dump(args.trace)
+    display.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+import numpy as np
+
+# 查找表的级数：亮度、渐变与脉动都量化为 256 级（与 8 位颜色通道一致）
+LEVELS = 256
+
+
+# --- 1. 颜色表 ---
+def brightness_palette(color, low=0.0, high=1.0, levels=LEVELS):
+    """把一种基色按亮度 low..high 展开成 levels 级的调色板（levels×3，uint8，超出 255 截断）"""
+    k = np.linspace(low, high, levels, dtype=np.float32)[:, None]
+    return np.minimum(np.asarray(color, dtype=np.float32) * k, 255).astype(np.uint8)
+
+
+def gradient(start, end, levels=LEVELS):
+    """从 start 到 end 的线性渐变色表（levels×3，uint8）"""
+    t = np.linspace(0, 1, levels, dtype=np.float32)[:, None]
+    start = np.asarray(start, dtype=np.float32)
+    end = np.asarray(end, dtype=np.float32)
+    return (start * (1 - t) + end * t).astype(np.uint8)
+
+
+class PaletteTable:
+    """多种基色的亮度调色板叠成一张表：第 i 种颜色的第 level 级位于 i × levels + level
+
+    每帧只需一次整数加法和一次 np.take 取色，不再做逐粒子的浮点乘法、截断与类型转换。
+    """
+
+    def __init__(self, colors, low=0.0, high=1.0, levels=LEVELS):
+        self.levels = levels
+        self.table = np.concatenate([brightness_palette(c, low, high, levels) for c in colors])
+
+    def offsets(self, variants):
+        """每个粒子所用基色在表中的起始位置（进场时计算一次）"""
+        return np.asarray(variants, dtype=np.intp) * self.levels
+
+    def lookup(self, offsets, level, out=None):
+        """按亮度级取色；level 为 0..levels-1 的整数数组，可原地复用"""
+        level += offsets
+        return np.take(self.table, level, axis=0, out=out)
+
+
+# --- 2. 脉动与渐变的量化 ---
+def wave_level(phase, out=None, levels=LEVELS):
+    """0.5 + 0.5·sin(phase) 量化为 0..levels-1 的表索引（phase 为浮点数组时会被原地改写）
+
+    NumPy 的整列 sin 比按相位查正弦表再 gather 更快，因此只量化结果，不查正弦表。
+    """
+    phase = np.sin(phase, out=phase if isinstance(phase, np.ndarray) and phase.dtype.kind == "f" else None)
+    half = (levels - 1) / 2
+    phase *= half
+    phase += half
+    if out is None:
+        return phase.astype(np.intp)
+    out[...] = phase  # 截断为整数
+    return out
+
+
+def level_of(t, levels=LEVELS):
+    """0..1 的比例（标量或数组）对应的表索引，超出范围时截断"""
+    return np.clip(np.asarray(t) * (levels - 1), 0, levels - 1).astype(np.intp)
@@ -0,0 +1,131 @@
+import numpy as np
+
+# 泊松圆盘点集的面密度（点数 × r² / 面积）：候选点无限多时趋于堵塞极限 0.6965，
+# 默认 8 倍候选点时实测约 0.55；留出约 5% 余量估计半径，通常一次就能得到足够的点
+SAMPLED_DENSITY = 0.52
+# 归一化后模型最长边的长度（与内置飞机同一量级的单位坐标）
+FORMATION_EXTENT = 1.1
+
+
+# --- 1. OBJ 读取 ---
+def load_obj(path):
+    """读取 OBJ 网格，返回 (顶点 V×3 float32, 三角形 F×3 int64)
+
+    只使用 v 与 f 行；多边形按扇形拆成三角形，支持 v/vt/vn 写法与负数（相对）索引。
+    """
+    vertices, polygons = [], []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith("v "):
+                vertices.append(line.split()[1:4])
+            elif line.startswith("f "):
+                polygons.append([int(token.split("/")[0]) for token in line.split()[1:]])
+    vertices = np.array(vertices, dtype=np.float32).reshape(-1, 3)
+
+    # 按边数分组后整组拆成三角形：(0, i, i + 1)
+    triangles = []
+    for size in sorted({len(polygon) for polygon in polygons}):
+        if size < 3:
+            continue
+        group = np.array([polygon for polygon in polygons if len(polygon) == size], dtype=np.int64)
+        group = np.where(group < 0, len(vertices) + group, group - 1)
+        fan = np.arange(1, size - 1)
+        triangles.append(np.stack([np.repeat(group[:, :1], len(fan), axis=1), group[:, fan], group[:, fan + 1]],
+                                  axis=2).reshape(-1, 3))
+    faces = np.concatenate(triangles) if triangles else np.zeros((0, 3), dtype=np.int64)
+    if len(faces) and (faces.min() < 0 or faces.max() >= len(vertices)):
+        raise ValueError(f"{path} 的面引用了不存在的顶点")
+    return vertices, faces
+
+
+# --- 2. 表面采样 ---
+def triangle_areas(vertices, faces):
+    a, b, c = (vertices[faces[:, i]].astype(np.float64) for i in range(3))
+    return 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+
+
+def sample_surface(vertices, faces, count, rng=None, areas=None):
+    """按面积加权在网格表面均匀撒 count 个随机点（白噪声，作为泊松圆盘的候选点）"""
+    rng = rng if rng is not None else np.random.default_rng()
+    areas = triangle_areas(vertices, faces) if areas is None else areas
+    cumulative = np.cumsum(areas)
+    if len(cumulative) == 0 or cumulative[-1] <= 0:
+        raise ValueError("网格没有面积不为 0 的三角形")
+    tri = np.minimum(np.searchsorted(cumulative, rng.random(count) * cumulative[-1], side="right"),
+                     len(faces) - 1)
+    # 三角形内均匀分布的重心坐标：(1 - √u, √u (1 - v), √u v)
+    su = np.sqrt(rng.random(count))[:, None]
+    v = rng.random(count)[:, None]
+    a, b, c = (vertices[faces[tri, i]] for i in range(3))
+    return ((1 - su) * a + su * (1 - v) * b + su * v * c).astype(np.float32)
+
+
+def poisson_disk(candidates, radius, rng=None):
+    """从候选点中挑出两两距离不小于 radius 的子集（网格加速的并行飞镖法），返回候选点序号
+
+    网格边长取 radius / √3，每个格子最多容纳一个点。格子按 (i, j, k) 各模 3 分成 27 组，
+    同组格子相隔至少两格（> radius），组内各格同时挑选候选点互不冲突，
+    因此每一轮只需整列检查周围 5×5×5 个格子中已接受的点，逐组推进即可，
+    没有逐点的 Python 循环。候选点足够多时结果接近最大泊松圆盘点集。
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    points = np.asarray(candidates, dtype=np.float32)
+    cell = radius / np.sqrt(3)
+    coords = np.floor((points - points.min(axis=0)) / cell).astype(np.int64)
+    dims = coords.max(axis=0) + 5  # 邻域偏移 ±2 后仍为非负的唯一编码
+    shifted = coords + 2
+    keys = (shifted[:, 0] * dims[1] + shifted[:, 1]) * dims[2] + shifted[:, 2]
+    cells, inverse = np.unique(keys, return_inverse=True)
+    occupant = np.full(len(cells), -1, dtype=np.int64)  # 每个格子已接受的候选点
+
+    offsets = np.stack(np.meshgrid(*[np.arange(-2, 3)] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+    offset_keys = (offsets[:, 0] * dims[1] + offsets[:, 1]) * dims[2] + offsets[:, 2]
+    phase = (coords[:, 0] % 3) * 9 + (coords[:, 1] % 3) * 3 + coords[:, 2] % 3
+    order = rng.permutation(len(points))
+    r2 = np.float32(radius * radius)
+
+    for group in range(27):
+        pending = order[phase[order] == group]
+        while len(pending):
+            # 每个空格子取一个候选点，其余留到下一轮
+            pending = pending[occupant[inverse[pending]] < 0]
+            if len(pending) == 0:
+                break
+            _, first = np.unique(inverse[pending], return_index=True)
+            trial = pending[first]
+            pending = np.delete(pending, first)
+
+            neighbor = keys[trial][:, None] + offset_keys
+            slot = np.minimum(np.searchsorted(cells, neighbor), len(cells) - 1)
+            taken = np.where(cells[slot] == neighbor, occupant[slot], -1)
+            near = points[np.maximum(taken, 0)] - points[trial][:, None, :]
+            conflict = ((taken >= 0) & (np.einsum("ijk,ijk->ij", near, near) < r2)).any(axis=1)
+            accepted = trial[~conflict]
+            occupant[inverse[accepted]] = accepted
+    return np.sort(occupant[occupant >= 0])
+
+
+def mesh_formation(vertices, faces, count, rng=None, oversample=8, iterations=5):
+    """网格 -> 恰好 count 个间距均匀的编队点（居中并缩放到最长边 FORMATION_EXTENT）
+
+    按面积与目标点数估计泊松圆盘半径；点数不足时缩小半径重来，
+    多出的点随机去掉，仍不足时用剩余候选点补齐（不会出现重叠的点）。
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    areas = triangle_areas(vertices, faces)
+    candidates = sample_surface(vertices, faces, count * oversample, rng, areas)
+    radius = np.sqrt(SAMPLED_DENSITY * areas.sum() / count)
+    for _ in range(iterations):
+        chosen = poisson_disk(candidates, radius, rng)
+        if len(chosen) >= count:
+            chosen = rng.choice(chosen, count, replace=False)
+            break
+        radius *= np.sqrt(len(chosen) / count) * 0.98
+    else:
+        rest = np.setdiff1d(np.arange(len(candidates)), chosen)
+        chosen = np.concatenate([chosen, rng.choice(rest, count - len(chosen), replace=False)])
+
+    points = candidates[np.sort(chosen)]
+    low, high = points.min(axis=0), points.max(axis=0)
+    scale = FORMATION_EXTENT / max(float((high - low).max()), 1e-9)
+    return ((points - (low + high) / 2) * scale).astype(np.float32)
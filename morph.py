@@ -0,0 +1,143 @@
+import numpy as np
+
+
+# --- 1. 近似最优的点对分配 ---
+def plan_morph(source, target, refine=6):
+    """为两组数量相同的点规划一一对应：source[i] 飞向 target[assignment[i]]
+
+    以总移动距离平方和最小为目标的近似解，复杂度 O(n log² n)，不使用 O(n³) 的匈牙利算法：
+    1. 空间二分：两组点一起按包围盒最长的轴在中位数处对半切分，递归到每格一个点，
+       同一格中的源点与目标点配对（相邻的源点飞向相邻的目标点，路径很少交叉）；
+    2. 局部交换：沿二分顺序比较相距 1, 2, 4, ... 的两对，交换目标能缩短距离时就交换。
+    """
+    source = np.asarray(source, dtype=np.float32)
+    target = np.asarray(target, dtype=np.float32)
+    n = len(source)
+    if len(target) != n:
+        raise ValueError(f"源点数 {n} 与目标点数 {len(target)} 不一致")
+    if n == 0:
+        return np.zeros(0, dtype=np.intp)
+
+    src, dst = _bisect(source, target)
+    for _ in range(refine):
+        step = 1
+        while step < n:
+            for offset in (0, step):
+                _swap_pass(source, target, src, dst, step, offset)
+            step *= 2
+
+    assignment = np.empty(n, dtype=np.intp)
+    assignment[src] = dst
+    return assignment
+
+
+def _bisect(source, target):
+    """逐层切分，返回按空间格子排列的源点序号与目标点序号（同一位置即为一对）"""
+    n = len(source)
+    src = np.arange(n)
+    dst = np.arange(n)
+    segment = np.zeros(n, dtype=np.int64)
+    position = np.arange(n)
+    while True:
+        starts = np.flatnonzero(np.r_[True, segment[1:] != segment[:-1]])
+        sizes = np.diff(np.r_[starts, n])
+        if sizes.max() <= 1:
+            return src, dst
+        # 每个格子按两组点合并后的包围盒最长轴切分
+        s, d = source[src], target[dst]
+        low = np.minimum(np.minimum.reduceat(s, starts), np.minimum.reduceat(d, starts))
+        high = np.maximum(np.maximum.reduceat(s, starts), np.maximum.reduceat(d, starts))
+        axis = np.repeat(np.argmax(high - low, axis=1), sizes)
+        src = src[np.lexsort((s[position, axis], segment))]
+        dst = dst[np.lexsort((d[position, axis], segment))]
+        rank = position - np.repeat(starts, sizes)
+        segment = segment * 2 + (rank >= np.repeat(sizes // 2, sizes))
+
+
+def _swap_pass(source, target, src, dst, step, offset):
+    """比较位置 i 与 i + step 的两对（互不重叠），交换目标能减小距离平方和时交换"""
+    n = len(src)
+    i = np.arange(offset, n - step)
+    i = i[((i - offset) // step) % 2 == 0]
+    j = i + step
+    a, b = source[src[i]], source[src[j]]
+    ta, tb = target[dst[i]], target[dst[j]]
+    # |a-ta|² + |b-tb|² - |a-tb|² - |b-ta|² = 2·(a-b)·(tb-ta)
+    gain = np.einsum("ij,ij->i", a - b, tb - ta)
+    swap = gain > 0
+    i, j = i[swap], j[swap]
+    dst[i], dst[j] = dst[j], dst[i].copy()
+
+
+# --- 2. 编队序列与逐帧插值 ---
+def smoothstep(t):
+    return t * t * (3 - 2 * t)
+
+
+class MorphSequence:
+    """按顺序循环展示的多个编队：每个编队停留 hold 秒，再用 morph 秒整批过渡到下一个
+
+    进场时一次性为相邻编队规划点对，并把每个编队重排成与前一个对齐
+    （第 i 个点从 stages[k][i] 飞到 stages[k+1][i]），逐帧只做一次向量插值。
+    最后一段回到第一个编队时，点的编号整体置换一次（cycle_map），之后继续循环。
+    """
+
+    def __init__(self, formations, variants, hold=6.0, morph=3.0, refine=6):
+        self.hold = hold
+        self.morph = morph
+        self.stages = [np.asarray(formations[0], dtype=np.float32)]
+        self.variants = [np.asarray(variants[0])]
+        for points, colors in zip([*formations[1:], formations[0]], [*variants[1:], variants[0]]):
+            assignment = plan_morph(self.stages[-1], points, refine)
+            self.stages.append(np.asarray(points, dtype=np.float32)[assignment])
+            self.variants.append(np.asarray(colors)[assignment])
+        # 最后一段的目标是第一个编队的重排：回到开头后第 i 个点位于 stages[0][wrap[i]]
+        self.wrap = assignment
+        self._cycle = 0
+        self._cycle_map = np.arange(len(self.stages[0]))
+
+    @classmethod
+    def from_stages(cls, stages, variants, wrap, hold=6.0, morph=3.0):
+        """用已经对齐的编队（如从磁盘缓存读取的 stages / variants / wrap）构造，跳过规划"""
+        sequence = cls.__new__(cls)
+        sequence.hold = hold
+        sequence.morph = morph
+        sequence.stages = [np.asarray(points, dtype=np.float32) for points in stages]
+        sequence.variants = [np.asarray(colors) for colors in variants]
+        sequence.wrap = np.asarray(wrap)
+        sequence._cycle = 0
+        sequence._cycle_map = np.arange(len(sequence.wrap))
+        return sequence
+
+    def __len__(self):
+        return len(self.stages) - 1
+
+    @property
+    def period(self):
+        return len(self) * (self.hold + self.morph)
+
+    def _map_for_cycle(self, cycle):
+        if cycle < self._cycle:
+            self._cycle, self._cycle_map = 0, np.arange(len(self.wrap))
+        while self._cycle < cycle:
+            self._cycle_map = self.wrap[self._cycle_map]
+            self._cycle += 1
+        return self._cycle_map
+
+    def evaluate(self, t, out):
+        """把 t 时刻的点坐标写入 out（N×3），返回各点当前的颜色变体"""
+        cycle, local = divmod(t, self.period) if self.period > 0 else (0, 0.0)
+        index = self._map_for_cycle(int(cycle))
+        stage, phase = divmod(local, self.hold + self.morph)
+        stage = int(stage)
+        start = self.stages[stage]
+        if phase <= self.hold:
+            np.take(start, index, axis=0, out=out)
+            return self.variants[stage][index]
+        u = np.float32(smoothstep((phase - self.hold) / self.morph))
+        end = self.stages[stage + 1]
+        np.take(start, index, axis=0, out=out)
+        out *= 1 - u
+        out += end[index] * u
+        return self.variants[stage + 1 if u >= 0.5 else stage][index]
+
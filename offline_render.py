@@ -0,0 +1,157 @@
+import os
+
+# 离线渲染不需要窗口：在导入 pygame 之前切换到 SDL 的 dummy 视频驱动
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import importlib.util
+import json
+import math
+import multiprocessing
+import sys
+import time
+
+import pygame
+
+from bloom import GLOW_MODES
+from projectors import ProjectorLayout, TiledOutput, parse_grid
+from quality import QUALITY_NAMES, quality_level
+from recorder import frame_path, write_frame
+from render_target import parse_size
+
+# 可离线渲染的脚本
+SCRIPTS = {
+    "luogang": "luogang_projection.py",
+    "3d": "3d.py",
+}
+
+_loaded = {}
+
+
+# --- 1. 工具函数 ---
+def load_script(name):
+    """按名称导入投影脚本（3d.py 不是合法模块名，需按路径加载）"""
+    if name not in _loaded:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), SCRIPTS[name])
+        spec = importlib.util.spec_from_file_location(f"_show_{name}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded[name] = module
+    return _loaded[name]
+
+
+def trail_preroll_frames(fade_alpha):
+    """拖尾衰减到 1 个色阶以下所需的帧数
+
+    每帧以 fade_alpha 覆盖一层背景，残影按 (1 - a/255)^n 衰减；
+    从某一帧开始独立渲染时，先预滚这么多帧即可得到与连续渲染一致的拖尾。
+    TrailBuffer 让画面始终从上方逼近背景色，背景上不会留下残影；
+    但每帧在同一位置重复叠加的高亮区域（如分形树干）会停在与历史有关的
+    8 位不动点上，分段边界之后的这些像素与连续渲染最多相差约 255 / fade_alpha 个色阶。
+    """
+    return math.ceil(math.log(1 / 255) / math.log(1 - fade_alpha / 255))
+
+
+def tile_dir(out_dir, tile):
+    return os.path.join(out_dir, f"projector_{tile.column}_{tile.row}")
+
+
+# --- 2. 分段渲染（在进程池中执行）---
+def render_chunk(job):
+    """渲染 [start, end) 区间的帧，返回写出的帧数
+
+    给出 projectors（列数, 行数, 重叠, gamma）时 size 为单台投影机的分辨率：
+    场景绘制到拼接画布，每台投影机的融合后画面写入各自的子目录（见 tile_dir）。
+    """
+    script, size, fps, seed, fmt, quality, glow, out_dir, start, end, projectors = job
+    module = load_script(script)
+    if projectors:
+        columns, rows, overlap, gamma = projectors
+        tiles = TiledOutput(ProjectorLayout(columns, rows, size, overlap, gamma))
+        surface = tiles.surface
+    else:
+        tiles = None
+        surface = pygame.Surface(size)
+    renderer = module.FrameRenderer(surface, seed=seed, glow=glow)
+    renderer.quality = quality_level(quality)  # 离线渲染固定画质，不做自适应
+
+    # 预滚：从 start 之前若干帧开始绘制，让拖尾与连续渲染一致
+    first = max(0, start - trail_preroll_frames(module.FADE_ALPHA))
+    for frame in range(first, end):
+        renderer.render_at(frame / fps, frame)
+        if frame < start:
+            continue
+        if tiles is None:
+            write_frame(surface, frame_path(out_dir, frame, fmt), fmt)
+        else:
+            tiles.present()
+            for tile, buffer in zip(tiles.layout.tiles, tiles.buffers):
+                write_frame(buffer, frame_path(tile_dir(out_dir, tile), frame, fmt), fmt)
+    renderer.close()
+    return end - start
+
+
+def plan_chunks(start, count, chunk):
+    return [(s, min(start + count, s + chunk)) for s in range(start, start + count, chunk)]
+
+
+# --- 3. 命令行入口 ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="以固定时间步长离线渲染投影画面为图像序列")
+    parser.add_argument("script", choices=sorted(SCRIPTS), help="要渲染的脚本")
+    parser.add_argument("--out", default="frames", help="输出目录")
+    parser.add_argument("--size", type=parse_size, default=(1920, 1080),
+                        help="输出分辨率，如 3840x2160（多投影机时为单台投影机的分辨率）")
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--duration", type=float, default=12.0, help="渲染时长（秒）")
+    parser.add_argument("--start", type=int, default=0, help="起始帧号")
+    parser.add_argument("--format", choices=["png", "raw"], default="png",
+                        help="png 图像序列，或 raw（每帧一个 RGB24 文件）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quality", choices=QUALITY_NAMES, default="high", help="固定画质等级")
+    parser.add_argument("--glow", choices=GLOW_MODES, default="sprites", help="外发光方式")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=300, help="每个任务连续渲染的帧数")
+    parser.add_argument("--projectors", metavar="COLSxROWS", type=parse_grid,
+                        help="多投影机拼接，如 3x1：每台投影机输出到 projector_<列>_<行> 子目录")
+    parser.add_argument("--overlap", type=int, default=0, help="相邻投影机画面的重叠宽度（像素）")
+    parser.add_argument("--blend-gamma", type=float, default=2.2, help="投影机的 gamma，用于融合带的亮度补偿")
+    args = parser.parse_args(argv)
+
+    count = int(round(args.duration * args.fps))
+    projectors = (*args.projectors, args.overlap, args.blend_gamma) if args.projectors else None
+    os.makedirs(args.out, exist_ok=True)
+    meta = {"script": args.script, "width": args.size[0], "height": args.size[1],
+            "fps": args.fps, "start": args.start, "frames": count,
+            "format": args.format, "seed": args.seed, "quality": args.quality, "glow": args.glow}
+    if projectors:
+        layout = ProjectorLayout(*projectors[:2], args.size, args.overlap, args.blend_gamma)
+        meta["projectors"] = {"columns": layout.columns, "rows": layout.rows, "overlap": layout.overlap,
+                              "gamma": layout.gamma, "canvas": list(layout.canvas_size),
+                              "dirs": [os.path.basename(tile_dir(args.out, tile)) for tile in layout.tiles]}
+        for tile in layout.tiles:
+            os.makedirs(tile_dir(args.out, tile), exist_ok=True)
+    with open(os.path.join(args.out, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    jobs = [(args.script, args.size, args.fps, args.seed, args.format, args.quality, args.glow, args.out, s, e,
+             projectors)
+            for s, e in plan_chunks(args.start, count, args.chunk)]
+
+    started = time.perf_counter()
+    done = 0
+    # spawn：每个子进程各自初始化 SDL，避免 fork 继承显示状态
+    with multiprocessing.get_context("spawn").Pool(args.workers) as pool:
+        for n in pool.imap_unordered(render_chunk, jobs):
+            done += n
+            elapsed = time.perf_counter() - started
+            print(f"\r{done}/{count} 帧  {done / elapsed:.1f} fps", end="", file=sys.stderr)
+        # SDL 会接管 SIGTERM，不能依赖 Pool.terminate()，需让子进程正常退出
+        pool.close()
+        pool.join()
+    print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import numpy as np
+
+
+# --- 1. 结构化数组粒子缓冲（替代每帧的字典列表）---
+class ParticleBuffer:
+    """预分配的 NumPy 列式粒子缓冲：x, y, size, rgb, alpha
+
+    各场景生成器每帧先 clear()，再用 append() 以向量方式写入一批粒子；
+    容量不足时按倍数扩容，稳定运行后不再产生新的数组分配。
+    """
+
+    def __init__(self, capacity=4096):
+        self.count = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.rgb = np.zeros((capacity, 3), dtype=np.uint8)
+        self.alpha = np.zeros(capacity, dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def reserve(self, n):
+        """确保还能再写入 n 个粒子"""
+        needed = self.count + n
+        if needed <= self.capacity:
+            return
+        old = (self.x, self.y, self.size, self.rgb, self.alpha)
+        count = self.count
+        self._allocate(max(needed, self.capacity * 2))
+        for dst, src in zip((self.x, self.y, self.size, self.rgb, self.alpha), old):
+            dst[:count] = src[:count]
+
+    def append(self, x, y, size, rgb, alpha):
+        """写入一批粒子；标量参数会广播到整批，返回写入数量"""
+        n = np.size(x)
+        if n == 0:
+            return 0
+        self.reserve(n)
+        start, end = self.count, self.count + n
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.size[start:end] = size
+        self.rgb[start:end] = np.clip(rgb, 0, 255)
+        self.alpha[start:end] = np.clip(alpha, 0, 255)
+        self.count = end
+        return n
+
+    def columns(self):
+        """返回当前有效部分的各列视图 (x, y, size, rgb, alpha)"""
+        n = self.count
+        return self.x[:n], self.y[:n], self.size[:n], self.rgb[:n], self.alpha[:n]
+
+    def visible_mask(self, width, height):
+        """屏幕范围内的粒子掩码"""
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        return (x >= 0) & (x < width) & (y >= 0) & (y < height)
+
+    def visible(self, width, height):
+        """按屏幕范围筛选后的各列"""
+        mask = self.visible_mask(width, height)
+        return tuple(column[mask] for column in self.columns())
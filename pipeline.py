@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+# --- 1. 模拟 / 绘制流水线 ---
+class SimulationPipeline:
+    """在工作线程上提前计算下一帧的场景状态，主线程同时绘制并提交当前帧
+
+    场景需为双缓冲（Scene.double_buffered）：工作线程的 update 写入后台缓冲，
+    主线程的 render 读取前台缓冲，collect() 取用结果时交换两者。
+    NumPy 运算与 pygame 的 blit 大多会释放 GIL，两条线程真正并行，
+    一帧的耗时接近最慢的一段，而不是各段之和。同一时刻只有一帧在计算中。
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simulate")
+        self._scene = None
+        self._future = None
+
+    def submit(self, scene, update, *args):
+        """在工作线程上调用 update(*args)，为 scene 计算下一帧"""
+        self.wait()
+        self._scene = scene
+        self._future = self._executor.submit(update, *args)
+
+    def collect(self, scene):
+        """取用为 scene 预先计算的一帧：成功时交换前后台缓冲并返回 True
+
+        没有计算中的帧，或计算的是其他场景（已切换）时返回 False，由调用方同步计算。
+        """
+        pending = self._scene
+        if not self.wait() or pending is not scene:
+            return False
+        scene.swap()
+        return True
+
+    def wait(self):
+        """等待计算中的帧完成（切换场景前调用，避免与 teardown 冲突），返回是否有帧在计算"""
+        future, self._future, self._scene = self._future, None, None
+        if future is None:
+            return False
+        future.result()  # 工作线程中的异常在主线程重新抛出
+        return True
+
+    def shutdown(self):
+        self.wait()
+        self._executor.shutdown(wait=True)
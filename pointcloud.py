@@ -0,0 +1,138 @@
+import math
+import numpy as np
+
+from lut import PaletteTable, wave_level
+
+# 闪烁亮度范围：0.6 ± 0.4
+SHADE_LOW, SHADE_HIGH = 0.2, 1.0
+
+
+# --- 1. 旋转与投影矩阵 ---
+def rotation_matrix(angle_x, angle_y, angle_z):
+    """组合旋转矩阵：依次绕 X、Y、Z 轴旋转（R = Rz · Ry · Rx）"""
+    cx, sx = math.cos(angle_x), math.sin(angle_x)
+    cy, sy = math.cos(angle_y), math.sin(angle_y)
+    cz, sz = math.cos(angle_z), math.sin(angle_z)
+    rx = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    ry = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    rz = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    return rz @ ry @ rx
+
+
+def projection_matrix(rotation, camera_distance, fov, width, height):
+    """把旋转、相机平移和透视投影合并成一个 3x4 矩阵
+
+    对每个点 p，M · [p, 1] = (sx·w, sy·w, w)，其中 w 为相机空间深度，
+    除以 w 即得屏幕坐标。
+    """
+    m = np.empty((3, 4))
+    m[0, :3] = fov * rotation[0] + width / 2 * rotation[2]
+    m[1, :3] = fov * rotation[1] + height / 2 * rotation[2]
+    m[2, :3] = rotation[2]
+    m[:, 3] = (width / 2 * camera_distance, height / 2 * camera_distance, camera_distance)
+    return m
+
+
+# --- 2. 绘制顺序 ---
+DEPTH_ORDERS = ("additive", "bucket", "sort")
+
+
+def depth_order(depth, visible, mode="bucket", buckets=1024):
+    """返回可见点的绘制顺序（索引数组）
+
+    - additive：全部加法混合，与顺序无关，直接返回可见点
+    - bucket：按深度分成固定数量的桶，从远到近（16 位整数键，NumPy 使用基数排序）
+    - sort：按深度精确排序，从远到近
+    """
+    index = np.flatnonzero(visible)
+    if mode == "additive" or len(index) == 0:
+        return index
+    d = depth[index]
+    if mode == "sort":
+        return index[np.argsort(-d, kind="stable")]
+
+    near, far = float(d.min()), float(d.max())
+    scale = (buckets - 1) / (far - near) if far > near else 0.0
+    key = ((far - d) * scale).astype(np.uint16)  # 远处为 0
+    return index[np.argsort(key, kind="stable")]
+
+
+# --- 3. 点云引擎 ---
+class PointCloud:
+    """以 N×3 数组保存的 3D 点云（每个点相当于一架无人机）
+
+    每帧只构建一次组合矩阵，旋转、投影、大小与颜色全部整列计算，
+    结果写入预分配的数组（x2d, y2d, depth, size, rgb, visible）。
+    """
+
+    def __init__(self, positions, color_variants, palette, phases=None, rng=None):
+        self.positions = np.ascontiguousarray(positions, dtype=np.float32)
+        n = len(self.positions)
+        rng = rng if rng is not None else np.random.default_rng()
+        self.color_variants = np.asarray(color_variants, dtype=np.int64) % len(palette)
+        self.palette = np.asarray(palette, dtype=np.float32)
+        self.phases = (rng.uniform(0, 2 * math.pi, n) if phases is None
+                       else np.asarray(phases)).astype(np.float32)
+        self.palette_table = PaletteTable(self.palette, SHADE_LOW, SHADE_HIGH)
+        self._palette_offsets = self.palette_table.offsets(self.color_variants)
+        self._wave = np.empty(n, dtype=np.float32)
+        self._level = np.empty(n, dtype=np.intp)
+
+        self._clip = np.empty((n, 3), dtype=np.float32)
+        self.x2d = np.empty(n, dtype=np.float32)
+        self.y2d = np.empty(n, dtype=np.float32)
+        self.depth = np.empty(n, dtype=np.float32)
+        self.size = np.empty(n, dtype=np.float32)
+        self.rgb = np.empty((n, 3), dtype=np.uint8)
+        self.visible = np.empty(n, dtype=bool)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def twin(self):
+        """共享点坐标、配色与闪烁相位，但拥有独立输出数组的副本（双缓冲用）"""
+        return PointCloud(self.positions, self.color_variants, self.palette, phases=self.phases)
+
+    def set_variants(self, variants):
+        """更换各点的颜色变体（编队变换时使用）"""
+        self.color_variants = np.asarray(variants, dtype=np.int64) % len(self.palette)
+        self._palette_offsets = self.palette_table.offsets(self.color_variants)
+
+    def project(self, angle_x, angle_y, angle_z, camera_distance, fov, width, height, limit=None):
+        """旋转并透视投影所有点，返回可见点数量
+
+        limit 只处理前 limit 个点（画质调节用；点序应预先打乱，前缀即均匀子集）。
+        """
+        k = len(self) if limit is None else min(limit, len(self))
+        m = projection_matrix(rotation_matrix(angle_x, angle_y, angle_z),
+                              camera_distance, fov, width, height).astype(np.float32)
+        clip = self._clip[:k]
+        np.matmul(self.positions[:k], m[:, :3].T, out=clip)
+        clip += m[:, 3]
+
+        w = clip[:, 2]
+        visible = self.visible[:k]
+        np.greater(w, 0, out=visible)  # 相机后方的点不可见
+        self.visible[k:] = False
+        np.copyto(self.depth[:k], w)
+        safe_w = np.where(visible, w, 1)
+        np.divide(clip[:, 0], safe_w, out=self.x2d[:k])
+        np.divide(clip[:, 1], safe_w, out=self.y2d[:k])
+
+        # 根据深度调整粒子大小（近大远小）
+        size = self.size[:k]
+        np.multiply(self.depth[:k], -0.3, out=size)
+        size += 4
+        np.maximum(size, 1, out=size)
+        return int(visible.sum())
+
+    def shade(self, current_time, limit=None):
+        """更新颜色（动态闪烁）：亮度量化为 256 级，直接从各基色的亮度调色板取色
+
+        limit 与 project 相同，只为前 limit 个点着色（其余点不可见，不会绘制）。
+        """
+        k = len(self) if limit is None else min(limit, len(self))
+        wave = self._wave[:k]
+        np.add(self.phases[:k], np.float32(current_time * 2), out=wave)
+        level = wave_level(wave, out=self._level[:k])
+        self.palette_table.lookup(self._palette_offsets[:k], level, out=self.rgb[:k])
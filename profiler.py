@@ -0,0 +1,171 @@
+import csv
+import json
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+
+import numpy as np
+import pygame
+
+# 一帧中依次计时的阶段
+STAGES = ("events", "generate", "fade", "draw", "bloom", "upscale", "record", "hud", "flip", "tick")
+
+
+# --- 1. 分阶段计时 ---
+class _StageTimer:
+    """可复用的计时上下文（避免每帧创建新对象）"""
+
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.started
+
+
+class FrameProfiler:
+    """逐帧记录各阶段耗时，按场景统计 p50/p95/p99 与掉帧数
+
+    用法：每个阶段包在 `with profiler.stage("draw"):` 中，
+    每帧结束时调用 end_frame(scene_name)。时间单位均为毫秒。
+    """
+
+    def __init__(self, target_fps=60, window=600, max_trace=100_000):
+        self.budget = 1000.0 / target_fps
+        self.window = window
+        self.current = {}
+        self.frame = 0
+        self.annotations = {}
+        self._timers = {}
+        self._samples = defaultdict(lambda: defaultdict(lambda: deque(maxlen=window)))
+        self._frames = defaultdict(int)
+        self._dropped = defaultdict(int)
+        self._trace = deque(maxlen=max_trace)
+        self._started = time.perf_counter()
+        self._last = self._started
+
+    def stage(self, name):
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _StageTimer(self, name)
+        return timer
+
+    def annotate(self, **values):
+        """附加到之后每一帧记录中的状态量（如当前画质等级）"""
+        self.annotations.update(values)
+
+    def end_frame(self, scene):
+        now = time.perf_counter()
+        frame_ms = (now - self._last) * 1000
+        self._last = now
+
+        samples = self._samples[scene]
+        samples["frame"].append(frame_ms)
+        stages = {name: seconds * 1000 for name, seconds in self.current.items()}
+        for name, ms in stages.items():
+            samples[name].append(ms)
+
+        # 超出预算 1.5 倍视为错过一次垂直同步，按错过的整帧数计入掉帧
+        dropped = max(0, round(frame_ms / self.budget) - 1) if frame_ms > self.budget * 1.5 else 0
+        self._frames[scene] += 1
+        self._dropped[scene] += dropped
+
+        self._trace.append({"frame": self.frame, "time": round(now - self._started, 6),
+                            "scene": scene, "frame_ms": frame_ms, "dropped": dropped,
+                            **stages, **self.annotations})
+        self.frame += 1
+        self.current = {}
+
+    # --- 2. 统计与导出 ---
+    def summary(self):
+        """每个场景各阶段的滚动分位数（最近 window 帧）"""
+        result = {}
+        for scene, samples in self._samples.items():
+            stats = {}
+            for name, values in samples.items():
+                p50, p95, p99 = np.percentile(np.fromiter(values, float), (50, 95, 99))
+                stats[name] = {"p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3)}
+            result[scene] = {"frames": self._frames[scene], "dropped": self._dropped[scene],
+                             "stages": stats}
+        return result
+
+    def dump(self, path):
+        """导出追踪数据：.csv 为逐帧明细，其余按 JSON（含统计摘要）"""
+        if path.lower().endswith(".csv"):
+            columns = ["frame", "time", "scene", "frame_ms", "dropped", *STAGES]
+            columns += sorted({key for row in self._trace for key in row} - set(columns))
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=columns)
+                writer.writeheader()
+                writer.writerows(self._trace)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"budget_ms": self.budget, "summary": self.summary(),
+                           "trace": list(self._trace)}, f, ensure_ascii=False, indent=1)
+
+
+class NullProfiler:
+    """关闭计时时使用的空实现"""
+
+    frame = 0
+
+    def stage(self, name):
+        return nullcontext()
+
+    def annotate(self, **values):
+        pass
+
+    def end_frame(self, scene):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+# --- 3. 屏幕叠加层 ---
+class ProfilerOverlay:
+    """在画面左上角显示当前场景的分阶段耗时（每 0.5 秒刷新一次文字）"""
+
+    def __init__(self, profiler, refresh=0.5, font_size=18):
+        self.profiler = profiler
+        self.refresh = refresh
+        self.font = pygame.font.Font(None, font_size)
+        self.visible = True
+        self._lines = []
+        self._updated = 0.0
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def _render_lines(self, scene):
+        stats = self.profiler.summary().get(scene)
+        if stats is None:
+            return []
+        lines = [f"{scene}  frames {stats['frames']}  dropped {stats['dropped']}"]
+        for name in ("frame", *STAGES):
+            s = stats["stages"].get(name)
+            if s:
+                lines.append(f"{name:<9} p50 {s['p50']:6.2f}  p95 {s['p95']:6.2f}  p99 {s['p99']:6.2f} ms")
+        for key, value in self.profiler.annotations.items():
+            lines.append(f"{key}: {value}")
+        color = (200, 255, 200)
+        return [self.font.render(line, True, color, (0, 0, 0)) for line in lines]
+
+    def draw(self, surface, scene):
+        if not self.visible:
+            return
+        now = time.perf_counter()
+        if now - self._updated >= self.refresh:
+            self._lines = self._render_lines(scene)
+            self._updated = now
+        y = 8
+        for line in self._lines:
+            surface.blit(line, (8, y))
+            y += line.get_height()
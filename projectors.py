@@ -0,0 +1,156 @@
+from collections import namedtuple
+
+import numpy as np
+import pygame
+
+# 每台投影机的画面：canvas 为它在虚拟画布上的区域，output 为它在输出窗口（拼接桌面）上的位置
+Tile = namedtuple("Tile", "column row canvas output")
+
+# 融合遮罩的定点精度：乘数 0..255 对应 0..1（与 pygame 的 BLEND_RGB_MULT 一致）
+MASK_ONE = 255
+
+
+# --- 1. 拼接布局与融合遮罩 ---
+def parse_grid(text):
+    """"3x1" -> (列数, 行数)"""
+    columns, rows = text.lower().split("x")
+    return int(columns), int(rows)
+
+
+def blend_ramp(length, gamma=2.2):
+    """重叠带内从 0 升到 1 的融合乘数（长度 length，定点 0..MASK_ONE）
+
+    两台投影机在重叠带内的亮度权重按 smoothstep 互补（相加恒为 1），
+    投影机输出的亮度约为像素值的 gamma 次方，因此像素乘数取权重的 1/gamma 次方。
+    """
+    t = (np.arange(length) + 0.5) / max(1, length)
+    weight = t * t * (3 - 2 * t)
+    return np.rint(weight ** (1 / gamma) * MASK_ONE).astype(np.uint8)
+
+
+class ProjectorLayout:
+    """columns × rows 台投影机拼成一块虚拟画布，相邻画面重叠 overlap 像素
+
+    每台投影机的分辨率为 tile_size；虚拟画布宽为 columns·w − (columns − 1)·overlap（高同理）。
+    融合遮罩在构造时一次算好：每台投影机只在与邻居重叠的边上有一条渐变带，
+    masks[i] 为第 i 台投影机的 (带区域, 乘数数组) 列表，乘数数组按 surfarray 的 (x, y) 排列。
+    """
+
+    def __init__(self, columns, rows, tile_size, overlap=0, gamma=2.2):
+        tile_w, tile_h = tile_size
+        if not 0 <= overlap < min(tile_w, tile_h):
+            raise ValueError(f"重叠宽度 {overlap} 超出投影机分辨率 {tile_w}x{tile_h}")
+        self.columns = columns
+        self.rows = rows
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.gamma = gamma
+        self.canvas_size = (columns * tile_w - (columns - 1) * overlap,
+                            rows * tile_h - (rows - 1) * overlap)
+        self.output_size = (columns * tile_w, rows * tile_h)
+        self.tiles = [Tile(c, r,
+                           pygame.Rect(c * (tile_w - overlap), r * (tile_h - overlap), tile_w, tile_h),
+                           pygame.Rect(c * tile_w, r * tile_h, tile_w, tile_h))
+                      for r in range(rows) for c in range(columns)]
+        ramp = blend_ramp(overlap, gamma)
+        self.masks = [self._edge_masks(tile, ramp) for tile in self.tiles]
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def _edge_masks(self, tile, ramp):
+        o = self.overlap
+        if o == 0:
+            return []
+        tile_w, tile_h = self.tile_size
+        columns = lambda r: np.broadcast_to(r[:, None], (o, tile_h))  # 左右边：逐列渐变
+        rows = lambda r: np.broadcast_to(r[None, :], (tile_w, o))  # 上下边：逐行渐变
+        masks = []
+        if tile.column > 0:
+            masks.append((pygame.Rect(0, 0, o, tile_h), columns(ramp)))
+        if tile.column < self.columns - 1:
+            masks.append((pygame.Rect(tile_w - o, 0, o, tile_h), columns(ramp[::-1])))
+        if tile.row > 0:
+            masks.append((pygame.Rect(0, 0, tile_w, o), rows(ramp)))
+        if tile.row < self.rows - 1:
+            masks.append((pygame.Rect(0, tile_h - o, tile_w, o), rows(ramp[::-1])))
+        return masks
+
+    def tile_at(self, pos):
+        """输出窗口上的像素坐标 -> (投影机序号, 虚拟画布上的坐标)"""
+        tile_w, tile_h = self.tile_size
+        column = min(max(int(pos[0] // tile_w), 0), self.columns - 1)
+        row = min(max(int(pos[1] // tile_h), 0), self.rows - 1)
+        tile = self.tiles[row * self.columns + column]
+        return tile, (tile.canvas.x + pos[0] - tile.output.x, tile.canvas.y + pos[1] - tile.output.y)
+
+
+def mask_surface(multiplier, like):
+    """乘数数组 -> 灰度遮罩表面（与 like 同一像素格式），供 BLEND_RGB_MULT 叠加"""
+    surface = pygame.Surface(multiplier.shape, 0, like)
+    pygame.surfarray.blit_array(surface, np.repeat(multiplier[:, :, None], 3, axis=2))
+    return surface
+
+
+# --- 2. 分块输出 ---
+class TiledOutput:
+    """场景只绘制一次到虚拟画布，再切成每台投影机的画面并做边缘融合
+
+    与 render_target.ScaledRenderTarget 接口相同（surface / size / map_point / present），
+    投影脚本可直接替换。output 为拼接桌面（各投影机画面按行列并排、互不重叠）时，
+    每台投影机的缓冲是 output 的子表面，切片直接写入窗口；output 为 None 时（无窗口测试、
+    离线渲染）每台投影机各有一块独立的表面，见 buffers。
+    scale < 1 时画布按比例缩小绘制，每块画面在切片时各自放大，不再放大整幅画布。
+    投影机数量只增加切片与融合带的开销，场景生成与绘制仍然只做一次。
+    """
+
+    def __init__(self, layout, output=None, scale=1.0, smooth=True):
+        self.layout = layout
+        self.output = output
+        self.scale = scale
+        self.smooth = smooth
+        canvas_w, canvas_h = layout.canvas_size
+        if scale >= 1.0:
+            size = layout.canvas_size
+            self._sources = [tile.canvas for tile in layout.tiles]
+        else:
+            size = (max(1, round(canvas_w * scale)), max(1, round(canvas_h * scale)))
+            self._sources = [_scaled_rect(tile.canvas, scale, size) for tile in layout.tiles]
+        # 有输出窗口时与其同一像素格式，切片时不做格式转换
+        self.surface = pygame.Surface(size, 0, output) if output is not None else pygame.Surface(size)
+        if output is not None:
+            self.buffers = [output.subsurface(tile.output) for tile in layout.tiles]
+        else:
+            self.buffers = [pygame.Surface(layout.tile_size, 0, self.surface) for _ in layout.tiles]
+        # 融合遮罩预先转成表面：逐帧只是每条融合带一次 SDL 乘法混合
+        self._masks = [[(mask_surface(multiplier, buffer), rect.topleft) for rect, multiplier in masks]
+                       for buffer, masks in zip(self.buffers, layout.masks)]
+
+    @property
+    def size(self):
+        return self.surface.get_size()
+
+    def map_point(self, pos):
+        """输出窗口上的像素坐标（如鼠标位置）换算为画布上的坐标"""
+        _, (x, y) = self.layout.tile_at(pos)
+        scale = min(self.scale, 1.0)
+        return x * scale, y * scale
+
+    def present(self):
+        """切出每台投影机的画面，写入各自的缓冲并乘上融合遮罩"""
+        for buffer, source, masks in zip(self.buffers, self._sources, self._masks):
+            if self.scale >= 1.0:
+                buffer.blit(self.surface, (0, 0), source)
+            elif self.smooth:
+                pygame.transform.smoothscale(self.surface.subsurface(source), buffer.get_size(), buffer)
+            else:
+                pygame.transform.scale(self.surface.subsurface(source), buffer.get_size(), buffer)
+            for mask, position in masks:
+                buffer.blit(mask, position, special_flags=pygame.BLEND_RGB_MULT)
+
+
+def _scaled_rect(rect, scale, size):
+    x, y = round(rect.x * scale), round(rect.y * scale)
+    right = min(size[0], round(rect.right * scale))
+    bottom = min(size[1], round(rect.bottom * scale))
+    return pygame.Rect(x, y, max(1, right - x), max(1, bottom - y))
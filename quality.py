@@ -0,0 +1,89 @@
+from collections import namedtuple
+
+# --- 1. 画质等级 ---
+# particles：粒子预算比例；glow_radius：发光半径比例；glow：是否绘制外发光
+QualityLevel = namedtuple("QualityLevel", "name particles glow_radius glow")
+
+QUALITY_LEVELS = [
+    QualityLevel("high", 1.0, 1.0, True),
+    QualityLevel("medium", 0.7, 0.85, True),
+    QualityLevel("low", 0.45, 0.7, True),
+    QualityLevel("minimal", 0.25, 0.5, False),
+]
+QUALITY_NAMES = [level.name for level in QUALITY_LEVELS]
+
+
+def quality_level(name):
+    return QUALITY_LEVELS[QUALITY_NAMES.index(name)]
+
+
+# --- 2. 自适应调节 ---
+class QualityGovernor:
+    """根据每帧的工作耗时（不含 CLOCK.tick 的等待）自动升降画质
+
+    带迟滞：平滑后的耗时连续 downgrade_after 帧超出预算才降一级，
+    连续 upgrade_after 帧低于预算的 headroom 比例才升一级，
+    每次切换后经过 cooldown 帧才会再次调整，避免来回抖动。
+    pin() 可固定等级（录制时使用），此时不再自动调整。
+    """
+
+    def __init__(self, target_fps=60, levels=QUALITY_LEVELS, start=0, downgrade_after=20,
+                 upgrade_after=240, headroom=0.6, cooldown=60, smoothing=0.1, pinned=None):
+        self.levels = levels
+        self.budget = 1.0 / target_fps
+        self.index = start
+        self.downgrade_after = downgrade_after
+        self.upgrade_after = upgrade_after
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.pinned = pinned
+        if pinned is not None:
+            self.index = pinned
+        self.average = None
+        self._over = 0
+        self._under = 0
+        self._wait = 0
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def pin(self, index):
+        self.pinned = self.index = index
+
+    def unpin(self):
+        self.pinned = None
+
+    def update(self, work_seconds):
+        """记录一帧的工作耗时；等级发生变化时返回 True"""
+        if self.average is None:
+            self.average = work_seconds
+        else:
+            self.average += (work_seconds - self.average) * self.smoothing
+        if self.pinned is not None:
+            return False
+        if self._wait > 0:
+            self._wait -= 1
+            return False
+
+        if self.average > self.budget:
+            self._over += 1
+            self._under = 0
+        elif self.average < self.budget * self.headroom:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.downgrade_after and self.index < len(self.levels) - 1:
+            return self._change(self.index + 1)
+        if self._under >= self.upgrade_after and self.index > 0:
+            return self._change(self.index - 1)
+        return False
+
+    def _change(self, index):
+        self.index = index
+        self._over = self._under = 0
+        self._wait = self.cooldown
+        return True
@@ -0,0 +1,174 @@
+import multiprocessing
+import os
+import queue
+import shutil
+import subprocess
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+import pygame
+
+RECORD_FORMATS = ("video", "raw", "png")
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".avi")
+
+
+# --- 1. 图像序列（离线渲染与演出录制共用）---
+def frame_path(out_dir, frame, fmt):
+    ext = "png" if fmt == "png" else "rgb"
+    return os.path.join(out_dir, f"frame_{frame:06d}.{ext}")
+
+
+def write_frame(surface, path, fmt):
+    if fmt == "png":
+        pygame.image.save(surface, path)
+    else:
+        to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+        with open(path, "wb") as f:
+            f.write(to_bytes(surface, "RGB"))
+
+
+# --- 2. 演出录制（后台进程写出）---
+class FrameRecorder:
+    """把现场演出的画面录制为视频或图像序列，主循环每帧只做一次内存拷贝
+
+    画面按 fps 采样：capture(surface, t) 在演出时间 t 跨过下一个录制帧时，
+    把画面原始像素拷贝进共享内存中的一个空闲槽位（环形缓冲，共 buffers 个槽位），
+    由后台写出进程转换颜色并写出：
+    video 通过管道交给 ffmpeg 编码（找不到 ffmpeg 时改为 raw 序列），
+    raw 为每帧一个 RGB24 文件，png 为 PNG 序列（编码较慢，现场帧率下会频繁丢帧）。
+    PNG 编码在 pygame 中不释放 GIL，因此写出放在独立进程而不是线程中。
+
+    丢帧策略：没有空闲槽位（写出落后于演出）时丢弃当前这一帧并计入 dropped，
+    已排队的帧照常写出，主循环从不等待写出进程。演出帧率低于录制帧率时，
+    缺少的录制帧计入 skipped。图像序列按录制帧号命名，缺帧处留下编号空缺；
+    视频在缺帧处重复上一帧，时长与演出时间一致。
+    """
+
+    def __init__(self, path, fps=30, fmt=None, buffers=8):
+        if fmt is None:
+            fmt = "video" if path.lower().endswith(VIDEO_EXTENSIONS) else "raw"
+        if fmt == "video" and shutil.which("ffmpeg") is None:
+            path = os.path.splitext(path)[0]
+            print(f"未找到 ffmpeg，改为录制 RGB24 原始帧序列到 {path}/", file=sys.stderr)
+            fmt = "raw"
+        self.path = path
+        self.fps = fps
+        self.fmt = fmt
+        self.buffers = buffers
+        self.captured = self.dropped = self.skipped = 0
+        self._last = None
+        self._staging = None
+        self._memory = None
+        self._process = None
+
+    def start(self, surface):
+        """按 surface 的尺寸与像素格式分配环形缓冲并启动写出进程"""
+        if surface.get_bytesize() not in (3, 4):
+            self._staging = pygame.Surface(surface.get_size(), 0, 32)  # 其他位深先转成 32 位
+            surface = self._staging
+        self.size = surface.get_size()
+        self.frame_bytes = surface.get_pitch() * self.size[1]
+        self._memory = shared_memory.SharedMemory(create=True, size=self.frame_bytes * self.buffers)
+        self._ring = np.ndarray((self.buffers, self.frame_bytes), np.uint8, self._memory.buf)
+        self._free = list(range(self.buffers))
+
+        # 写出进程需要的像素布局：行跨度、每像素字节数与 R、G、B 所在的字节（小端序）
+        layout = (surface.get_pitch(), surface.get_bytesize(), [shift // 8 for shift in surface.get_shifts()[:3]])
+        if self.fmt != "video":
+            os.makedirs(self.path, exist_ok=True)
+        ctx = multiprocessing.get_context("spawn")
+        self._ready = ctx.Queue()
+        self._returned = ctx.Queue()
+        self._process = ctx.Process(target=_write_frames, name="recorder", daemon=True,
+                                    args=(self._memory.name, self.buffers, self.size, layout,
+                                          self.fmt, self.path, self.fps, self._ready, self._returned))
+        self._process.start()
+        return self
+
+    def capture(self, surface, t):
+        """演出时间 t 到达下一个录制帧时拷贝画面；返回本帧是否被录制"""
+        index = int(t * self.fps)
+        if self._last is not None:
+            if index <= self._last:
+                return False  # 演出帧率高于录制帧率，本帧不需要
+            self.skipped += index - self._last - 1
+        self._last = index
+
+        while True:  # 回收写出进程已取走的槽位
+            try:
+                self._free.append(self._returned.get_nowait())
+            except queue.Empty:
+                break
+        if not self._free:
+            self.dropped += 1
+            return False
+
+        if self._staging is not None:
+            self._staging.blit(surface, (0, 0))
+            surface = self._staging
+        slot = self._free.pop()
+        view = surface.get_view("1")
+        self._ring[slot] = np.frombuffer(view, np.uint8)
+        del view  # 解除表面锁定
+        self._ready.put((slot, index))
+        self.captured += 1
+        return True
+
+    def counters(self):
+        return {"captured": self.captured, "dropped": self.dropped, "skipped": self.skipped,
+                "pending": self.buffers - len(self._free)}
+
+    def close(self):
+        """等待已排队的帧写完，结束写出进程并释放共享内存"""
+        if self._process is not None:
+            self._ready.put(None)
+            self._process.join()
+            self._process = None
+            self._free = list(range(self.buffers))
+        if self._memory is not None:
+            self._ring = None
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+
+def _write_frames(name, buffers, size, layout, fmt, path, fps, ready, returned):
+    """写出进程：按顺序取出排队的帧，转换为 RGB24 后写出"""
+    memory = shared_memory.SharedMemory(name=name)  # spawn 子进程与主进程共用资源跟踪器，由主进程释放
+    pitch, bytesize, channels = layout
+    width, height = size
+    ring = np.ndarray((buffers, height, pitch), np.uint8, memory.buf)
+    encoder = None
+    if fmt == "video":
+        encoder = subprocess.Popen(["ffmpeg", "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+                                    "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+                                    "-pix_fmt", "yuv420p", path], stdin=subprocess.PIPE)
+    last = previous = None
+    try:
+        while True:
+            item = ready.get()
+            if item is None:
+                break
+            slot, index = item
+            pixels = ring[slot, :, :width * bytesize].reshape(height, width, bytesize)
+            rgb = np.ascontiguousarray(pixels[:, :, channels]).tobytes()
+            returned.put(slot)  # 像素已复制出来，槽位可以复用
+            if encoder is not None:
+                # 缺帧（丢帧或演出慢于录制帧率）处重复上一帧，视频时长与演出一致
+                for _ in range(0 if last is None else index - last - 1):
+                    encoder.stdin.write(previous)
+                encoder.stdin.write(rgb)
+                previous = rgb
+            elif fmt == "raw":
+                with open(frame_path(path, index, fmt), "wb") as f:
+                    f.write(rgb)
+            else:
+                pygame.image.save(pygame.image.frombuffer(rgb, size, "RGB"), frame_path(path, index, fmt))
+            last = index
+    finally:
+        if encoder is not None:
+            encoder.stdin.close()
+            encoder.wait()
+        ring = pixels = None
+        memory.close()
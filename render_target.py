@@ -0,0 +1,87 @@
+import pygame
+
+
+# --- 1. 显示设置 ---
+def open_display(size, fullscreen=False, caption=None):
+    """打开显示窗口；全屏且未指定分辨率时使用桌面分辨率"""
+    flags = pygame.FULLSCREEN if fullscreen else 0
+    screen = pygame.display.set_mode(size if size else (0, 0), flags)
+    if caption:
+        pygame.display.set_caption(caption)
+    return screen
+
+
+class Display:
+    """投影窗口与帧时钟：构造时不初始化 SDL，首次访问 screen 时才打开窗口
+
+    投影脚本只在 main() 中创建它，导入模块不会打开窗口（基准测试、离线渲染可直接导入）。
+    size 为 None 且全屏时使用桌面分辨率。
+    """
+
+    def __init__(self, size=None, fullscreen=False, caption=None):
+        self.size = size
+        self.fullscreen = fullscreen
+        self.caption = caption
+        self._screen = None
+        self._clock = None
+
+    @property
+    def screen(self):
+        if self._screen is None:
+            pygame.init()
+            self._screen = open_display(self.size, self.fullscreen, self.caption)
+            self._clock = pygame.time.Clock()
+        return self._screen
+
+    def tick(self, fps):
+        """限制帧率（窗口尚未打开时不等待）"""
+        return self._clock.tick(fps) if self._clock is not None else 0
+
+    def close(self):
+        if self._screen is not None:
+            pygame.quit()
+            self._screen = self._clock = None
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+# --- 2. 降分辨率渲染 + 放大输出 ---
+class ScaledRenderTarget:
+    """场景先绘制到按比例缩小的离屏表面，每帧只放大一次到真实输出尺寸
+
+    scale 为 1 时直接绘制到输出表面，没有额外开销；
+    smooth 为 True 时使用双线性放大（更柔和，耗时略高），否则使用最近邻放大。
+    """
+
+    def __init__(self, output, scale=1.0, smooth=True):
+        self.output = output
+        self.scale = scale
+        self.smooth = smooth
+        out_w, out_h = output.get_size()
+        if scale >= 1.0:
+            self.surface = output
+        else:
+            size = (max(1, round(out_w * scale)), max(1, round(out_h * scale)))
+            self.surface = pygame.Surface(size, 0, output)  # 与输出表面同一像素格式
+
+    @property
+    def size(self):
+        return self.surface.get_size()
+
+    def map_point(self, pos):
+        """输出窗口上的像素坐标（如鼠标位置）换算为离屏表面上的坐标"""
+        out_w, out_h = self.output.get_size()
+        w, h = self.surface.get_size()
+        return pos[0] * w / out_w, pos[1] * h / out_h
+
+    def present(self):
+        """把离屏画面放大到输出表面"""
+        if self.surface is self.output:
+            return
+        if self.smooth:
+            pygame.transform.smoothscale(self.surface, self.output.get_size(), self.output)
+        else:
+            pygame.transform.scale(self.surface, self.output.get_size(), self.output)
@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from quality import QUALITY_LEVELS
+
+# 场景坐标与光点大小以 720p 为基准，按实际高度等比缩放
+REFERENCE_HEIGHT = 720
+
+# 已注册的场景类（场景标识 -> 类，按注册顺序）
+SCENES = {}
+
+
+def register_scene(cls):
+    """类装饰器：把场景加入注册表"""
+    if cls.id in SCENES:
+        raise ValueError(f"场景 {cls.id} 已注册")
+    SCENES[cls.id] = cls
+    return cls
+
+
+# --- 1. 场景插件接口 ---
+class Scene:
+    """场景插件基类
+
+    生命周期：构造（只保存参数，开销很小）→ setup(rng) 完成耗时的准备工作
+    （骨架、点云等；可能在后台线程执行，不得调用显示相关接口）→ 每帧
+    update(scene_time, rng) 计算本帧状态、render(surface, bloom) 绘制 →
+    离场时 teardown()。每次进入场景都会创建新的实例，状态在帧与帧之间保留。
+
+    double_buffered 的场景把每帧状态存放在前后两份缓冲中：update 只写后台，
+    render 只读前台，swap() 交换两者。流水线模式下 update 在工作线程上与
+    主线程的 render 并行执行；其余场景总是在主线程上依次计算与绘制。
+    """
+
+    id = None
+    name = ""
+    background = (0, 0, 0)
+    fade_alpha = 20  # 拖尾衰减强度（越大拖尾越短）
+    double_buffered = False
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.unit = height / REFERENCE_HEIGHT
+        self.quality = QUALITY_LEVELS[0]  # 由渲染器每帧更新
+
+    def setup(self, rng):
+        pass
+
+    def update(self, scene_time, rng):
+        pass
+
+    def swap(self):
+        """交换前后台帧状态（update 之后、render 之前调用）"""
+        pass
+
+    def render(self, surface, bloom=None):
+        """绘制本帧，返回绘制的光点数；给出 bloom 时外发光泼溅到其缓冲"""
+        return 0
+
+    def teardown(self):
+        pass
+
+
+# --- 2. 后台预热 ---
+class ScenePrewarmer:
+    """在工作线程上提前构造并 setup 即将进入的场景，切换时直接取用
+
+    setup 中的 NumPy 运算大多会释放 GIL，与主线程的绘制可以并行。
+    取用时若预热尚未完成则等待其结果；未被取用的预热结果会被 teardown。
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scene-prewarm")
+        self._pending = {}
+
+    def prewarm(self, key, factory):
+        """提交预热任务；同一 key 只提交一次"""
+        if key not in self._pending:
+            self._pending[key] = self._executor.submit(factory)
+
+    def take(self, key, factory):
+        """取出 key 对应的场景（未预热时在当前线程直接构造），并丢弃其余预热结果"""
+        future = self._pending.pop(key, None)
+        self.discard()
+        return future.result() if future is not None else factory()
+
+    def discard(self):
+        for future in self._pending.values():
+            if not future.cancel():
+                future.add_done_callback(_teardown_result)
+        self._pending.clear()
+
+    def shutdown(self):
+        self.discard()
+        self._executor.shutdown(wait=True)
+
+
+def _teardown_result(future):
+    if future.exception() is None:
+        future.result().teardown()
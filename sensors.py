@@ -0,0 +1,294 @@
+import argparse
+import asyncio
+import json
+import math
+import struct
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# 观众数据包（本地 UDP，每个数据包是一帧完整的人群快照，坐标按画面宽高归一化到 0..1）：
+#   JSON：{"seq": 12, "t": 1700000000.0, "points": [[x, y, density], ...]}
+#   OSC ："/crowd" 消息，类型标签 ",id" + "fff" × N（seq、发送时刻、每人 x, y, density）
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9000
+OSC_ADDRESS = b"/crowd"
+# 序号回退超过这么多帧（30 fps 下约 3 秒）时视为发送端重启，而不是迟到的数据包
+RESTART_GAP = 90
+
+# 主循环每帧读取的最新快照（不可变，整体替换）
+CrowdSnapshot = namedtuple("CrowdSnapshot", "seq sent received x y density")
+
+
+# --- 1. 数据包解析 ---
+def parse_packet(data):
+    """解析一个数据包，返回 (seq, 发送时刻, N×3 数组)；格式错误时抛出 ValueError"""
+    if data[:1] == b"/":
+        return _parse_osc(data)
+    try:
+        message = json.loads(data)
+        if not isinstance(message, dict):
+            raise TypeError(f"应为 JSON 对象，收到 {type(message).__name__}")
+        points = np.asarray(message.get("points", []), dtype=np.float32).reshape(-1, 3)
+        return int(message["seq"]), float(message.get("t", 0.0)), points
+    except (AttributeError, KeyError, OverflowError, TypeError, ValueError) as e:  # 含 JSON 与编码错误
+        raise ValueError(f"无法解析 JSON 数据包：{e}") from e
+
+
+def _osc_string(data, offset):
+    end = data.index(b"\0", offset)
+    return data[offset:end], (end + 4) & ~3  # OSC 字符串以 0 结尾并补齐到 4 字节
+
+
+def _parse_osc(data):
+    try:
+        address, offset = _osc_string(data, 0)
+        tags, offset = _osc_string(data, offset)
+        if address != OSC_ADDRESS or not tags.startswith(b",id") or (len(tags) - 3) % 3:
+            raise ValueError(f"不支持的 OSC 消息：{address!r} {tags!r}")
+        if any(tag != ord("f") for tag in tags[3:]):
+            raise ValueError(f"OSC 参数类型应为 float：{tags!r}")
+        seq, sent = struct.unpack_from(">id", data, offset)
+        values = np.frombuffer(data, dtype=">f4", count=len(tags) - 3, offset=offset + 12)
+        return seq, sent, values.astype(np.float32).reshape(-1, 3)
+    except (struct.error, ValueError) as e:
+        raise ValueError(f"无法解析 OSC 数据包：{e}") from e
+
+
+def encode_json(seq, sent, points):
+    return json.dumps({"seq": seq, "t": sent, "points": np.asarray(points).round(4).tolist()}).encode()
+
+
+def encode_osc(seq, sent, points):
+    points = np.asarray(points, dtype=">f4").reshape(-1, 3)
+    tags = b",id" + b"f" * points.size
+
+    def pad(s):
+        return s + b"\0" * (4 - len(s) % 4)
+
+    return pad(OSC_ADDRESS) + pad(tags) + struct.pack(">id", seq, sent) + points.tobytes()
+
+
+# --- 2. 后台接收服务 ---
+class SensorIngest:
+    """在后台线程的 asyncio 事件循环上接收观众数据，合并为最新快照
+
+    主循环每帧调用 latest() 读取一次，不会因网络阻塞。快照是不可变元组，
+    接收线程整体替换引用（CPython 中为原子操作），读写双方都不加锁。
+    只保留序号最新的一帧：两次读取之间到达的多帧合并（coalesced），
+    序号回退或发送时刻早于 max_latency 的数据包视为迟到（late），
+    序号跳跃视为途中丢失（dropped），无法解析的数据包计入 malformed。
+    序号大幅回退（超过 RESTART_GAP）或回退但发送时刻更新时，视为发送端重启（restarts），
+    从新的序号重新计数。
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_latency=0.25):
+        self.host = host
+        self.port = port
+        self.max_latency = max_latency
+        self.received = self.dropped = self.late = self.malformed = self.coalesced = self.restarts = 0
+        self._latest = None
+        self._last_seq = None
+        self._last_sent = 0.0
+        self._read_seq = None
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        """启动接收线程，端口绑定完成后返回（绑定失败时抛出 OSError）"""
+        self._thread = threading.Thread(target=self._run, name="sensor-ingest", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        loop = self._loop = asyncio.new_event_loop()
+        try:
+            transport, _ = loop.run_until_complete(loop.create_datagram_endpoint(
+                lambda: _IngestProtocol(self), local_addr=(self.host, self.port)))
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+        self.port = transport.get_extra_info("sockname")[1]  # port=0 时为系统分配的端口
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            transport.close()
+            loop.run_until_complete(asyncio.sleep(0))
+            loop.close()
+
+    def feed(self, data, now=None):
+        """处理一个数据包（接收线程调用；回放与测试也可直接调用）"""
+        now = time.time() if now is None else now
+        self.received += 1
+        try:
+            seq, sent, points = parse_packet(data)
+        except ValueError:
+            self.malformed += 1
+            return
+        if self._last_seq is not None:
+            if seq > self._last_seq:
+                self.dropped += seq - self._last_seq - 1
+            elif self._last_seq - seq > RESTART_GAP or (sent and self._last_sent and sent > self._last_sent):
+                self.restarts += 1  # 发送端重启，序号从头开始
+            else:
+                self.late += 1  # 乱序到达，已有更新的一帧
+                return
+        self._last_seq = seq
+        self._last_sent = sent
+        if sent and now - sent > self.max_latency:
+            self.late += 1
+            return
+        latest = self._latest
+        if latest is not None and latest.seq != self._read_seq:
+            self.coalesced += 1
+        self._latest = CrowdSnapshot(seq, sent, now, points[:, 0], points[:, 1], points[:, 2])
+
+    def latest(self, max_age=0.5):
+        """最新的人群快照；超过 max_age 秒没有收到新数据时返回 None（传感器离线）"""
+        snapshot = self._latest
+        if snapshot is None or time.time() - snapshot.received > max_age:
+            return None
+        self._read_seq = snapshot.seq
+        return snapshot
+
+    def counters(self):
+        return {"received": self.received, "dropped": self.dropped, "late": self.late,
+                "malformed": self.malformed, "coalesced": self.coalesced, "restarts": self.restarts}
+
+
+class _IngestProtocol(asyncio.DatagramProtocol):
+    def __init__(self, ingest):
+        self.ingest = ingest
+
+    def datagram_received(self, data, addr):
+        self.ingest.feed(data)
+
+
+def parse_address(text):
+    """"9000" 或 "0.0.0.0:9000" -> (host, port)"""
+    host, _, port = text.rpartition(":")
+    try:
+        return host or DEFAULT_HOST, int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的地址：{text}（应为 PORT 或 HOST:PORT）")
+
+
+# --- 3. 模拟与回放（现场没有传感器时的替身）---
+def simulate_crowd(visitors=40, rate=30, seed=0):
+    """生成模拟人群：每位观众在画面内缓慢游走，密度随时间起伏；逐帧产生 N×3 数组"""
+    rng = np.random.default_rng(seed)
+    position = rng.random((visitors, 2))
+    heading = rng.random(visitors) * 2 * math.pi
+    phase = rng.random(visitors) * 2 * math.pi
+    dt = 1 / rate
+    t = 0.0
+    while True:
+        heading += rng.normal(0, 0.4, visitors) * dt
+        position[:, 0] += np.cos(heading) * 0.05 * dt
+        position[:, 1] += np.sin(heading) * 0.05 * dt
+        # 碰到画面边缘时掉头
+        outside = (position < 0.05) | (position > 0.95)
+        heading[outside.any(axis=1)] += math.pi
+        np.clip(position, 0.05, 0.95, out=position)
+        density = 0.6 + 0.4 * np.sin(t * 0.7 + phase)
+        yield np.column_stack([position, density]).astype(np.float32)
+        t += dt
+
+
+async def _send(frames, host, port, rate, fmt="json", loss=0.0, seed=0):
+    """按 rate 帧每秒把 frames 发送到 host:port；loss 为模拟的丢包比例"""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(asyncio.DatagramProtocol, remote_addr=(host, port))
+    encode = encode_osc if fmt == "osc" else encode_json
+    rng = np.random.default_rng(seed)
+    start = loop.time()
+    try:
+        for seq, points in enumerate(frames):
+            if rng.random() >= loss:
+                transport.sendto(encode(seq, time.time(), points))
+            await asyncio.sleep(max(0.0, start + (seq + 1) / rate - loop.time()))
+    finally:
+        transport.close()
+
+
+def load_recording(path):
+    """读取 monitor --record 录制的 JSON Lines 文件，逐帧产生 N×3 数组"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield np.asarray(json.loads(line)["points"], dtype=np.float32).reshape(-1, 3)
+
+
+async def _monitor(ingest, record=None, interval=1.0):
+    """每 interval 秒打印一次计数；给出 record 时把收到的每一帧写入 JSON Lines 文件"""
+    out = open(record, "w", encoding="utf-8") if record else None
+    last_seq = None
+    try:
+        while True:
+            await asyncio.sleep(interval if out is None else 0.005)
+            snapshot = ingest.latest()
+            if out is not None and snapshot is not None and snapshot.seq != last_seq:
+                last_seq = snapshot.seq
+                points = np.column_stack([snapshot.x, snapshot.y, snapshot.density])
+                out.write(encode_json(snapshot.seq, snapshot.sent, points).decode() + "\n")
+            if out is None:
+                count = 0 if snapshot is None else len(snapshot.x)
+                print(f"{count} 人  " + "  ".join(f"{k} {v}" for k, v in ingest.counters().items()))
+    finally:
+        if out is not None:
+            out.close()
+
+
+# --- 4. 命令行入口 ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="观众传感器数据：模拟、回放与监视")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("simulate", help="向本地端口发送模拟人群")
+    p.add_argument("--to", type=parse_address, default=(DEFAULT_HOST, DEFAULT_PORT), help="目标 [HOST:]PORT")
+    p.add_argument("--visitors", type=int, default=40)
+    p.add_argument("--rate", type=float, default=30, help="每秒发送的帧数")
+    p.add_argument("--format", choices=["json", "osc"], default="json")
+    p.add_argument("--loss", type=float, default=0.0, help="模拟丢包比例（检验计数器）")
+    p.add_argument("--seed", type=int, default=0)
+    p = sub.add_parser("replay", help="按原帧率回放录制的人群数据")
+    p.add_argument("path")
+    p.add_argument("--to", type=parse_address, default=(DEFAULT_HOST, DEFAULT_PORT), help="目标 [HOST:]PORT")
+    p.add_argument("--rate", type=float, default=30, help="每秒发送的帧数")
+    p.add_argument("--format", choices=["json", "osc"], default="json")
+    p = sub.add_parser("monitor", help="监听端口，打印计数或录制收到的数据")
+    p.add_argument("--listen", type=parse_address, default=(DEFAULT_HOST, DEFAULT_PORT), help="监听 [HOST:]PORT")
+    p.add_argument("--record", metavar="PATH", help="录制为 JSON Lines 文件（供 replay 回放）")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "simulate":
+            frames = simulate_crowd(args.visitors, args.rate, args.seed)
+            asyncio.run(_send(frames, *args.to, args.rate, args.format, args.loss, args.seed))
+        elif args.command == "replay":
+            asyncio.run(_send(load_recording(args.path), *args.to, args.rate, args.format))
+        else:
+            ingest = SensorIngest(*args.listen)
+            asyncio.run(_monitor(ingest.start(), args.record))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import numpy as np
+import pygame
+from collections import OrderedDict
+
+
+# --- 1. 发光贴图缓存（LRU）---
+class GlowSpriteCache:
+    """按量化后的 (半径, 颜色, 透明度) 缓存发光圆形贴图，避免每帧重复创建 Surface"""
+
+    def __init__(self, capacity=1024, size_step=0.25, color_step=8, alpha_step=8):
+        self.capacity = capacity
+        self.size_step = size_step
+        self.color_step = color_step
+        self.alpha_step = alpha_step
+        self._sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def clear(self):
+        self._sprites.clear()
+
+    def key(self, radius, color, alpha, extent=3.0):
+        """量化参数，生成缓存键"""
+        cs = self.color_step
+        radius_q = round(radius / self.size_step) * self.size_step
+        color_q = tuple(min(255, int(round(c / cs)) * cs) for c in color)
+        alpha_q = min(255, int(round(alpha / self.alpha_step)) * self.alpha_step)
+        return (radius_q, color_q, alpha_q, extent)
+
+    def quantize(self, radius, rgb, alpha):
+        """key() 的向量版本：对整列参数做同样的量化"""
+        cs, as_ = self.color_step, self.alpha_step
+        radius_q = np.round(np.asarray(radius) / self.size_step) * self.size_step
+        rgb_q = np.minimum(255, np.round(np.asarray(rgb) / cs).astype(np.int32) * cs)
+        alpha_q = np.minimum(255, np.round(np.asarray(alpha) / as_).astype(np.int32) * as_)
+        return radius_q, rgb_q, alpha_q
+
+    def get(self, radius, color, alpha, extent=3.0):
+        """返回 (贴图, 半边长)；半径不足 1 像素时返回 (None, 0)
+
+        贴图边长为 radius * extent，圆心位于贴图中心。
+        """
+        return self._lookup(self.key(radius, color, alpha, extent))
+
+    def _lookup(self, key):
+        entry = self._sprites.get(key)
+        if entry is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        radius_q, color_q, alpha_q, extent = key
+        side = int(radius_q * extent)
+        if int(radius_q) < 1 or side < 1:
+            entry = (None, 0)
+        else:
+            sprite = pygame.Surface((side, side), pygame.SRCALPHA)
+            half = int(radius_q * extent / 2)
+            pygame.draw.circle(sprite, (*color_q, alpha_q), (half, half), int(radius_q))
+            entry = (sprite, half)
+
+        self._sprites[key] = entry
+        if len(self._sprites) > self.capacity:
+            self._sprites.popitem(last=False)  # 淘汰最久未使用的贴图
+        return entry
+
+
+# --- 2. 批量绘制 ---
+class SpriteBatch:
+    """收集一帧内所有发光贴图，最后一次性 blits 到目标表面"""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._sprites = []
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def add(self, x, y, radius, color, alpha, extent=3.0):
+        sprite, half = self.cache.get(radius, color, alpha, extent)
+        if sprite is not None:
+            self._sprites.append((sprite, (int(x - half), int(y - half))))
+
+    def add_arrays(self, x, y, radius, rgb, alpha, extent=3.0):
+        """批量加入一列粒子（量化在 NumPy 中一次完成）"""
+        if len(x) == 0:
+            return
+        radius_q, rgb_q, alpha_q = self.cache.quantize(radius, rgb, alpha)
+        lookup = self.cache._lookup
+        append = self._sprites.append
+        for px, py, r, color, a in zip(x.tolist(), y.tolist(), radius_q.tolist(),
+                                       map(tuple, rgb_q.tolist()), alpha_q.tolist()):
+            sprite, half = lookup((r, color, a, extent))
+            if sprite is not None:
+                append((sprite, (int(px - half), int(py - half))))
+
+    def flush(self, target, special_flags=pygame.BLEND_ADD):
+        """一次调用绘制整批贴图（pygame-ce 使用 fblits）"""
+        if self._sprites:
+            if hasattr(target, "fblits"):
+                target.fblits(self._sprites, special_flags)
+            else:
+                target.blits([(sprite, pos, None, special_flags) for sprite, pos in self._sprites],
+                             doreturn=False)
+        self._sprites.clear()
@@ -0,0 +1,215 @@
+import argparse
+import os
+
+import numpy as np
+
+from quality import QUALITY_NAMES, quality_level
+from render_target import parse_size
+
+# --- 1. 时间轴文件格式（.lgt）---
+# 32 字节文件头，之后依次为（均为小端、4 字节对齐）：
+#   bytes scenes        names_size       （烘焙时的演出顺序，逗号分隔的场景标识，UTF-8）
+#   uint32 frames       scene_count      （每个场景的帧数）
+#   uint32 offsets      frame_count + 1  （第 i 帧的粒子为 [offsets[i], offsets[i+1])）
+#   uint16 x, y         record_count     （按烘焙分辨率归一化到 0..65535）
+#   uint16 size         record_count     （720p 基准下的粒子半径，单位 1/64 像素）
+#   uint8 rgb           record_count × 3
+#   uint8 alpha         record_count
+# 各列整体 np.memmap 映射，播放时按帧切片，无需逐帧解析。
+MAGIC = b"LGTIMELN"
+VERSION = 2
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("fps", "<u4"),
+    ("scene_count", "<u4"),
+    ("frame_count", "<u4"),
+    ("record_count", "<u4"),
+    ("names_size", "<u4"),
+])
+POSITION_SCALE = 65535
+SIZE_SCALE = 64
+
+
+class Timeline:
+    """内存映射的烘焙时间轴：按 (场景编号, 场景内时间) 取出预先计算的粒子帧"""
+
+    def __init__(self, scenes, fps, frames, offsets, x, y, size, rgb, alpha, path=None):
+        self.scenes = scenes  # 烘焙时的演出顺序（场景标识列表），播放时须与之一致
+        self.fps = fps
+        self.frames = frames
+        self.first = np.concatenate(([0], np.cumsum(frames)[:-1])).astype(np.int64)
+        self.offsets = offsets
+        self.x = x
+        self.y = y
+        self.size = size
+        self.rgb = rgb
+        self.alpha = alpha
+        self.path = path
+
+    @property
+    def scene_count(self):
+        return len(self.frames)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def frame_index(self, scene_num, scene_time):
+        """场景内时间对应的帧号（超出烘焙长度时停在最后一帧）"""
+        local = min(max(0, int(scene_time * self.fps)), int(self.frames[scene_num]) - 1)
+        return int(self.first[scene_num]) + local
+
+    def emit(self, buffer, scene_num, scene_time, width, height, share=1.0):
+        """把一帧粒子反量化后写入粒子缓冲；share < 1 时均匀抽取 share 比例的粒子"""
+        buffer.clear()
+        i = self.frame_index(scene_num, scene_time)
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        if share >= 1:
+            frame = slice(start, end)
+        else:
+            frame = start + (np.arange(round((end - start) * max(share, 0))) / share).astype(np.intp)
+        return buffer.append(self.x[frame] * np.float32(width / POSITION_SCALE),
+                             self.y[frame] * np.float32(height / POSITION_SCALE),
+                             self.size[frame] * np.float32(1 / SIZE_SCALE),
+                             self.rgb[frame], self.alpha[frame])
+
+
+def load_timeline(path, show=None):
+    """以只读内存映射方式打开时间轴文件；给出 show 时检查其与烘焙时的演出顺序一致"""
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) == 0 or header["magic"][0] != MAGIC:
+        raise ValueError(f"{path} 不是时间轴文件")
+    if header["version"][0] != VERSION:
+        raise ValueError(f"{path} 的版本 {header['version'][0]} 不受支持")
+    scenes = int(header["scene_count"][0])
+    count = int(header["frame_count"][0])
+    records = int(header["record_count"][0])
+    names_size = int(header["names_size"][0])
+
+    with open(path, "rb") as f:
+        f.seek(HEADER.itemsize)
+        names = f.read(names_size).decode("utf-8").split(",")
+    if len(names) != scenes:
+        raise ValueError(f"{path} 记录的场景 {','.join(names)} 与场景数 {scenes} 不符")
+    if show is not None and list(show) != names:
+        raise ValueError(f"{path} 按演出顺序 {','.join(names)} 烘焙，与当前演出顺序 {','.join(show)} 不一致")
+
+    offset = HEADER.itemsize + _aligned(names_size)
+    columns = []
+    for dtype, shape in (("<u4", (scenes,)), ("<u4", (count + 1,)), ("<u2", (records,)),
+                         ("<u2", (records,)), ("<u2", (records,)), (np.uint8, (records, 3)),
+                         (np.uint8, (records,))):
+        size = np.dtype(dtype).itemsize * int(np.prod(shape))
+        columns.append(np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+                       if size else np.zeros(shape, dtype=dtype))
+        offset += _aligned(size)
+    frames, offsets, *data = columns
+    return Timeline(names, int(header["fps"][0]), np.asarray(frames), offsets, *data, path=path)
+
+
+def _aligned(size):
+    return -(-size // 4) * 4
+
+
+# --- 2. 烘焙 ---
+def bake_timeline(path, fps=60, size=None, seed=0, quality="high", show=None):
+    """按目标帧率逐帧采样 luogang_projection 演出中的各个场景，写入时间轴文件
+
+    与离线渲染相同，每帧的随机数按 (seed, 帧号) 播种，结果可复现。
+    只保存画面内的粒子；坐标按烘焙分辨率归一化，播放时再按实际分辨率展开。
+    只能烘焙以粒子缓冲输出的场景（ParticleScene），3D 点云场景需实时计算。
+    """
+    from offline_render import load_script  # 无窗口加载 luogang_projection.py
+
+    module = load_script("luogang")
+    show = show or module.SHOW
+    unknown = [name for name in show if name not in module.SCENES]
+    if unknown:
+        raise ValueError(f"未知场景：{', '.join(unknown)}（可选：{', '.join(module.SCENES)}）")
+    width, height = size or (module.WIDTH, module.HEIGHT)
+    renderer = module.FrameRenderer(module.pygame.Surface((width, height)), seed=seed, show=show)
+    renderer.quality = quality_level(quality)
+    for scene_id in renderer.show:
+        if not issubclass(module.SCENES[scene_id], module.ParticleScene):
+            raise ValueError(f"场景 {scene_id} 不是粒子场景，无法烘焙")
+
+    per_scene = max(1, round(module.SCENE_DURATION * fps))
+    frames = [per_scene] * len(renderer.show)
+    offsets = [0]
+    chunks = []
+    frame = 0
+    for scene_num in range(len(renderer.show)):
+        setup_rng = np.random.default_rng([seed, scene_num, 1])
+        for i in range(per_scene):
+            rng = np.random.default_rng([seed, frame])
+            scene = renderer.generate(scene_num, i / fps, scene_num, rng, setup_rng)
+            x, y, radius, rgb, alpha = scene.particles.visible(width, height)
+            chunks.append((
+                np.minimum(x * (POSITION_SCALE / width), POSITION_SCALE).astype("<u2"),
+                np.minimum(y * (POSITION_SCALE / height), POSITION_SCALE).astype("<u2"),
+                np.clip(np.rint(radius * SIZE_SCALE), 0, 65535).astype("<u2"),
+                rgb.copy(), alpha.copy(),
+            ))
+            offsets.append(offsets[-1] + len(x))
+            frame += 1
+
+    renderer.close()
+    names = ",".join(renderer.show).encode("utf-8")
+    header = np.zeros((), dtype=HEADER)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["fps"] = fps
+    header["scene_count"] = len(frames)
+    header["frame_count"] = frame
+    header["record_count"] = offsets[-1]
+    header["names_size"] = len(names)
+    with open(path, "wb") as f:
+        f.write(header.tobytes())
+        _write_aligned(f, np.frombuffer(names, dtype=np.uint8))
+        for column in (np.array(frames, dtype="<u4"), np.array(offsets, dtype="<u4")):
+            _write_aligned(f, column)
+        for k in range(5):
+            _write_aligned(f, np.concatenate([chunk[k] for chunk in chunks]))
+    return frame, offsets[-1]
+
+
+def _write_aligned(f, array):
+    data = array.tobytes()
+    f.write(data)
+    f.write(b"\0" * (_aligned(len(data)) - len(data)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="烘焙场景时间轴文件（.lgt）工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("bake", help="按帧率采样 luogang_projection.py 演出中的全部场景")
+    p.add_argument("out")
+    p.add_argument("--fps", type=int, default=60)
+    p.add_argument("--size", type=parse_size, help="烘焙分辨率（默认 1280x720，播放时按实际分辨率缩放）")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--quality", choices=QUALITY_NAMES, default="high", help="烘焙时的画质等级（决定粒子数量）")
+    p.add_argument("--scenes", help="逗号分隔的演出顺序（默认与 luogang_projection.py 相同，播放时需一致）")
+    p = sub.add_parser("info", help="查看时间轴文件")
+    p.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "bake":
+        try:
+            frames, records = bake_timeline(args.out, args.fps, args.size, args.seed, args.quality,
+                                           args.scenes.split(",") if args.scenes else None)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"{args.out}: {frames} 帧, {records} 个粒子, {os.path.getsize(args.out)} 字节")
+    else:
+        timeline = load_timeline(args.path)
+        counts = np.diff(np.asarray(timeline.offsets))
+        print(f"{args.path}: {len(timeline)} 帧 @ {timeline.fps} fps, "
+              f"{os.path.getsize(args.path)} 字节")
+        for scene_num, first in enumerate(timeline.first):
+            scene = counts[first:first + timeline.frames[scene_num]]
+            print(f"场景 {scene_num} {timeline.scenes[scene_num]}: {len(scene)} 帧, "
+                  f"每帧粒子 {scene.min()}..{scene.max()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import pygame
+
+
+# --- 1. 长曝光拖尾 ---
+class TrailBuffer:
+    """长曝光拖尾：目标表面本身就是持久的累积缓冲，每帧原地按指数衰减拉回背景色
+
+    衰减用一次 alpha 混合完成（pygame 的 SIMD 快速路径，比逐像素的
+    BLEND_MULT 填充或 NumPy 定点运算都快）。覆盖层只在背景色变化时重新填充。
+
+    8 位 alpha 混合从上方能精确收敛到背景色，从下方则会停在相差约
+    255 / alpha 个色阶处，因此画面始终保持不低于背景色：初始化时铺满背景，
+    背景变亮的过渡帧再用一次 BLEND_MAX 抬升。粒子都是加法混合，不会压低画面。
+
+    切换场景时背景色在 crossfade 帧内线性过渡，新旧场景的衰减自然交融，
+    不需要额外的整屏合成。
+    """
+
+    def __init__(self, surface, background, alpha, crossfade=30):
+        self.surface = surface
+        self.crossfade = crossfade
+        self._overlay = pygame.Surface(surface.get_size(), 0, surface)  # 与目标表面同一像素格式
+        self.alpha = None
+        self.set_alpha(alpha)
+        self.background = self.target = self._source = tuple(background)
+        self._step = crossfade
+        self._overlay.fill(self.background)
+        surface.fill(self.background)
+
+    def set_alpha(self, alpha):
+        """设置每帧的衰减强度（覆盖层不透明度，越大拖尾越短）"""
+        if alpha != self.alpha:
+            self.alpha = alpha
+            self._overlay.set_alpha(alpha)
+
+    def set_scene(self, background, alpha):
+        """切换到新场景的背景色与衰减强度；背景色相同时不做任何事"""
+        self.set_alpha(alpha)
+        background = tuple(background)
+        if background == self.target:
+            return
+        self._source = self.background
+        self.target = background
+        self._step = 0
+
+    def fade(self):
+        """每帧绘制粒子之前调用一次"""
+        if self._step < self.crossfade or self.background != self.target:
+            self._step = min(self._step + 1, self.crossfade)
+            t = self._step / self.crossfade if self.crossfade else 1.0
+            color = tuple(round(a + (b - a) * t) for a, b in zip(self._source, self.target))
+            if color != self.background:
+                rising = any(c > old for c, old in zip(color, self.background))
+                self.background = color
+                self._overlay.fill(color)
+                if rising:
+                    self.surface.blit(self._overlay, (0, 0), special_flags=pygame.BLEND_MAX)
+        self.surface.blit(self._overlay, (0, 0))